@@ -0,0 +1,37 @@
+import os
+import logging
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Base URL of the summarization service (e.g. http://localhost:8080); empty runs everything in-process
+SUMMARIZER_API_URL = os.getenv("SUMMARIZER_API_URL", "").rstrip("/")
+SUMMARIZER_API_TIMEOUT = int(os.getenv("SUMMARIZER_API_TIMEOUT", "300"))
+
+_session = requests.Session()
+
+
+def summarize_remote(url: str, language: str, word_count: int, base_url: str = None) -> dict:
+    """Summarize a URL through the headless summarization service."""
+    base_url = base_url or SUMMARIZER_API_URL
+    response = _session.post(
+        f"{base_url}/summarize",
+        json={"url": url, "language": language, "word_count": word_count},
+        timeout=SUMMARIZER_API_TIMEOUT,
+    )
+    if response.status_code >= 400:
+        try:
+            message = response.json().get("error", response.text)
+        except ValueError:
+            message = response.text
+        raise Exception(f"Summarization service error ({response.status_code}): {message}")
+    return response.json()
+
+
+def get_remote_summary(summary_id: str, base_url: str = None) -> dict:
+    """Fetch a previously created summary from the service by its id."""
+    base_url = base_url or SUMMARIZER_API_URL
+    response = _session.get(f"{base_url}/summary/{summary_id}", timeout=30)
+    response.raise_for_status()
+    return response.json()
@@ -0,0 +1,249 @@
+import os
+import json
+import uuid
+import time
+import asyncio
+import logging
+import sqlite3
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import validators
+from aiohttp import web
+
+from summarizer import LANGUAGES, create_llm, summarize_url, summary_flights
+from summary_cache import SUMMARY_CACHE_PATH, SummaryCache
+from mindmap_utils import MINDMAP_BACKEND, MINDMAP_BACKENDS, generate_mindmap_data
+from export_utils import create_pdf
+from job_queue import JOB_QUEUE_ENABLED, get_job_queue, summary_job_key
+
+logger = logging.getLogger(__name__)
+
+# Service settings (can be overridden through environment variables)
+API_WORKERS = int(os.getenv("SUMMARIZER_API_WORKERS", "8"))
+API_MAX_STORED = int(os.getenv("SUMMARIZER_API_MAX_STORED", "1000"))
+
+
+class SummaryStore:
+    """
+    Recent summaries addressed by id, kept in the shared summary cache database.
+
+    Every service instance pointed at the same database sees the same
+    records, so GET /summary/{id} works behind a load balancer without
+    sticky sessions.
+    """
+
+    def __init__(self, path: str = SUMMARY_CACHE_PATH, max_entries: int = API_MAX_STORED):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS api_summaries (
+                    id TEXT PRIMARY KEY,
+                    record TEXT NOT NULL,
+                    updated_at REAL NOT NULL)''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_api_summaries_updated_at ON api_summaries (updated_at)")
+        self._conn.commit()
+
+    def put(self, record: dict):
+        """Insert or update a record; call again after changing it."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO api_summaries (id, record, updated_at) VALUES (?, ?, ?)",
+                (record["id"], json.dumps(record), time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM api_summaries WHERE id NOT IN "
+                "(SELECT id FROM api_summaries ORDER BY updated_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def get(self, summary_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM api_summaries WHERE id = ?", (summary_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def json_error(status: int, message: str) -> web.Response:
+    return web.json_response({"error": message}, status=status)
+
+
+async def run_blocking(request: web.Request, fn, *args, **kwargs):
+    """Run blocking library code on the service's worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app["executor"], lambda: fn(*args, **kwargs))
+
+
+async def _summarize(request: web.Request, record: dict):
+    try:
+        result = await run_blocking(
+            request, summarize_url, record["url"], record["language"], record["word_count"],
+            llm=request.app["llm"], cache=request.app["cache"]
+        )
+        record.update(result, status="done")
+    except Exception as e:
+        logger.error(f"Summarization failed for {record['url']}: {str(e)}", exc_info=True)
+        record.update(status="failed", error=str(e))
+    record["finished_at"] = time.time()
+    request.app["store"].put(record)
+
+
+async def handle_summarize(request: web.Request) -> web.Response:
+    """POST /summarize {url, language, word_count, wait}"""
+    try:
+        body = await request.json()
+    except ValueError:
+        return json_error(400, "Request body must be JSON")
+
+    url = (body.get("url") or "").strip()
+    language = body.get("language", "English")
+    if not url or not validators.url(url):
+        return json_error(400, "A valid 'url' is required")
+    if language not in LANGUAGES:
+        return json_error(400, f"Unsupported language: {language}")
+    try:
+        word_count = int(body.get("word_count", 250))
+    except (TypeError, ValueError):
+        return json_error(400, "'word_count' must be an integer")
+
+    if JOB_QUEUE_ENABLED and not body.get("wait", True):
+        # Hand the work to the persistent queue so any worker process can pick it up
+        job_id = get_job_queue().enqueue(
+            "summarize", {"url": url, "language": language, "word_count": word_count},
+            dedupe_key=summary_job_key(url, language, word_count)
+        )
+        return web.json_response({"id": job_id, "status": "queued"}, status=202)
+
+    record = {
+        "id": uuid.uuid4().hex,
+        "status": "pending",
+        "url": url,
+        "language": language,
+        "word_count": word_count,
+        "created_at": time.time(),
+    }
+    request.app["store"].put(record)
+
+    if body.get("wait", True):
+        await _summarize(request, record)
+        status = 200 if record["status"] == "done" else 502
+        return web.json_response(record, status=status)
+
+    # Fire and forget; clients poll GET /summary/{id}
+    task = asyncio.create_task(_summarize(request, record))
+    request.app["tasks"].add(task)
+    task.add_done_callback(request.app["tasks"].discard)
+    return web.json_response(record, status=202)
+
+
+def _job_record(job: dict) -> dict:
+    record = {"id": job["id"], "status": job["status"], **job["payload"]}
+    if job["result"]:
+        record.update(job["result"])
+    if job["partial"] and job["status"] == "running":
+        record["partial"] = job["partial"]
+    if job["error"]:
+        record["error"] = job["error"]
+    return record
+
+
+def _get_record(request: web.Request):
+    summary_id = request.match_info["summary_id"]
+    record = request.app["store"].get(summary_id)
+    if record is None and JOB_QUEUE_ENABLED:
+        job = get_job_queue().get(summary_id)
+        if job is not None:
+            record = _job_record(job)
+            if record["status"] == "done":
+                # Keep finished jobs in the store so exports can attach to them
+                request.app["store"].put(record)
+    return record
+
+
+async def handle_get_summary(request: web.Request) -> web.Response:
+    """GET /summary/{id}"""
+    record = _get_record(request)
+    if record is None:
+        return json_error(404, "Summary not found")
+    return web.json_response(record)
+
+
+async def handle_get_pdf(request: web.Request) -> web.Response:
+    """GET /summary/{id}/pdf"""
+    record = _get_record(request)
+    if record is None or record["status"] != "done":
+        return json_error(404, "Summary not found or not finished")
+    pdf_bytes = await run_blocking(
+        request, create_pdf, record["summary"], record["url"], record["language"], f"{record['word_count']} words"
+    )
+    return web.Response(body=pdf_bytes, content_type="application/pdf")
+
+
+async def handle_get_mindmap(request: web.Request) -> web.Response:
+    """GET /summary/{id}/mindmap?backend=local|llm"""
+    record = _get_record(request)
+    if record is None or record["status"] != "done":
+        return json_error(404, "Summary not found or not finished")
+    backend = request.query.get("backend", MINDMAP_BACKEND)
+    if backend not in MINDMAP_BACKENDS:
+        return json_error(400, f"backend must be one of: {', '.join(MINDMAP_BACKENDS)}")
+    mindmaps = record.setdefault("mindmaps", {})
+    if backend not in mindmaps:
+        title = record.get("title") or "Content Summary"
+        try:
+            mindmaps[backend] = await run_blocking(
+                request, generate_mindmap_data, request.app["llm"], record["summary"], title[:30],
+                backend, record["language"]
+            )
+        except ValueError as e:
+            return json_error(422, str(e))
+        request.app["store"].put(record)
+    return web.json_response(mindmaps[backend])
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response({
+        "status": "ok",
+        "cache": request.app["cache"].stats(),
+        "in_flight": summary_flights.stats(),
+        "llm": request.app["llm"].stats(),
+    })
+
+
+async def _on_cleanup(app: web.Application):
+    for task in list(app["tasks"]):
+        task.cancel()
+    app["executor"].shutdown(wait=False)
+
+
+def create_app(workers: int = API_WORKERS) -> web.Application:
+    """Build the aiohttp application."""
+    app = web.Application()
+    app["llm"] = create_llm()
+    app["cache"] = SummaryCache()
+    app["store"] = SummaryStore()
+    app["executor"] = ThreadPoolExecutor(max_workers=workers)
+    app["tasks"] = set()
+    app.router.add_post("/summarize", handle_summarize)
+    app.router.add_get("/summary/{summary_id}", handle_get_summary)
+    app.router.add_get("/summary/{summary_id}/pdf", handle_get_pdf)
+    app.router.add_get("/summary/{summary_id}/mindmap", handle_get_mindmap)
+    app.router.add_get("/health", handle_health)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the headless summarization service.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Blocking worker threads")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(create_app(args.workers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
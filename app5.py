@@ -1,34 +1,23 @@
-import os
-import sqlite3
-import bcrypt
 import validators
 import streamlit as st
+import streamlit.components.v1 as components
 import time
 import logging
-from langchain.prompts import PromptTemplate
-from langchain_groq import ChatGroq
-from langchain.chains.summarize import load_summarize_chain
-from langchain.chains import LLMChain
-from langchain_community.document_loaders import UnstructuredURLLoader
-from yt_dlp import YoutubeDL
-from langchain.schema import Document
-from fpdf import FPDF
 from datetime import datetime
-from gtts import gTTS
-import tempfile
-import re
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, quote
-import base64
-from youtube_transcript_api import YouTubeTranscriptApi
-from urllib.parse import parse_qs, urlparse
-import json
-import random
-import string
-import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import threading
 import hashlib
-
+import io
+import json
+from summary_cache import SummaryCache
+from user_store import init_db, register_user, authenticate_user
+from session_tokens import (SESSION_COOKIE, SESSION_TOKEN_TTL, init_token_store, issue_token, verify_token,
+                            revoke_token)
+from summary_history import init_history, save_summary, update_mindmap, update_timings, get_entry, search_history
+from job_queue import JOB_QUEUE_ENABLED, JOB_POLL_INTERVAL, ACTIVE_STATUSES, get_job_queue, summary_job_key
+from pipeline import run_stages
+# Feature modules (langchain, Groq, yt-dlp, fpdf, gTTS, ...) are imported in the
+# authenticated branch below so the login page renders without loading them
 
 # Set up logging for debugging
 logging.basicConfig(level=logging.INFO)
@@ -36,53 +25,13 @@ logger = logging.getLogger(__name__)
 
 # Streamlit app configuration - MUST BE FIRST
 st.set_page_config(page_title="Enhanced Content Summarizer", page_icon="🌟")
-
-# Database setup
-def init_db():
-    conn = sqlite3.connect("users.db")
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL)''')
-    conn.commit()
-    conn.close()
-
-# Function to hash passwords
-def hash_password(password):
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-
-# Function to check password
-def verify_password(password, hashed_password):
-    return bcrypt.checkpw(password.encode(), hashed_password.encode())
-
-# Function to register a user
-def register_user(username, password):
-    conn = sqlite3.connect("users.db")
-    c = conn.cursor()
-    try:
-        c.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hash_password(password)))
-        conn.commit()
-        conn.close()
-        return True
-    except sqlite3.IntegrityError:
-        conn.close()
-        return False
-
-# Function to authenticate a user
-def authenticate_user(username, password):
-    conn = sqlite3.connect("users.db")
-    c = conn.cursor()
-    c.execute("SELECT password FROM users WHERE username = ?", (username,))
-    user = c.fetchone()
-    conn.close()
-    if user and verify_password(password, user[0]):
-        return True
-    return False
+rerun_start = time.perf_counter()
 
 # Add this near the beginning of your code where you define other functions
 def logout_user():
     """Reset authentication state to log out the user"""
+    if st.session_state.get("session_token"):
+        revoke_token(st.session_state["session_token"])
     for key in list(st.session_state.keys()):
         # Keep dark mode preference but clear everything else
         if key != "dark_mode":
@@ -92,14 +41,62 @@ def logout_user():
     st.session_state["authenticated"] = False
     st.session_state["username"] = ""
     st.session_state["messages"] = []
+    st.session_state["session_cookie_checked"] = True
+    queue_session_cookie(None)
+
+def queue_session_cookie(token):
+    """Store (or, with None, delete) the session cookie in the browser on the next render."""
+    st.session_state["pending_session_cookie"] = token or ""
+
+def write_pending_session_cookie():
+    """
+    Send a queued session cookie to the browser.
+
+    The token travels in a cookie rather than the URL, so it never ends up
+    in browser history, copied links or Referer headers.
+    """
+    if "pending_session_cookie" not in st.session_state:
+        return
+    token = st.session_state.pop("pending_session_cookie")
+    cookie = f"{SESSION_COOKIE}={token}; Max-Age={SESSION_TOKEN_TTL if token else 0}; Path=/; SameSite=Strict"
+    components.html(f"<script>window.parent.document.cookie = {json.dumps(cookie)};</script>", height=0)
 # Initialize database
 init_db()
+init_token_store()
+init_history()
+
+# Shared summary cache (one SQLite connection per process)
+@st.cache_resource
+def get_summary_cache():
+    return SummaryCache()
+
+# Shared LLM gateway (one set of Groq clients and one connection pool per process)
+@st.cache_resource
+def get_llm():
+    from summarizer import create_llm
+    return create_llm()
 
 # Session state for authentication and theme
 if "authenticated" not in st.session_state:
     st.session_state["authenticated"] = False
     st.session_state["username"] = ""
 
+# Links from older versions carried the session token in the URL; drop it
+st.query_params.pop("session", None)
+
+# Restore a login from its signed session cookie instead of asking for the password again
+# (the browser's cookies are fixed for the whole session, so they are checked once)
+if not st.session_state["authenticated"] and not st.session_state.get("session_cookie_checked") \
+        and st.context.cookies.get(SESSION_COOKIE):
+    st.session_state["session_cookie_checked"] = True
+    restored_user = verify_token(st.context.cookies[SESSION_COOKIE])
+    if restored_user:
+        st.session_state["authenticated"] = True
+        st.session_state["username"] = restored_user
+        st.session_state["session_token"] = st.context.cookies[SESSION_COOKIE]
+    else:
+        queue_session_cookie(None)
+
 # Initialize theme state
 if "dark_mode" not in st.session_state:
     st.session_state["dark_mode"] = False
@@ -352,6 +349,7 @@ def inject_custom_css():
 # Load CSS based on theme
 load_css()
 inject_custom_css()
+write_pending_session_cookie()
 
 # Authentication UI
 if not st.session_state["authenticated"]:
@@ -367,6 +365,8 @@ if not st.session_state["authenticated"]:
             if authenticate_user(login_username, login_password):
                 st.session_state["authenticated"] = True
                 st.session_state["username"] = login_username
+                st.session_state["session_token"] = issue_token(login_username)
+                queue_session_cookie(st.session_state["session_token"])
                 st.success("Login successful! Redirecting...")
                 st.rerun()
             else:
@@ -384,11 +384,32 @@ if not st.session_state["authenticated"]:
 
 # Main app when authenticated
 else:
+    from youtube_utils import is_youtube_url
+    from summarizer import LANGUAGES, SUMMARY_LENGTHS, summarize_url
+    from mindmap_utils import MINDMAP_BACKEND, MINDMAP_BACKENDS, generate_mindmap_data
+    from export_utils import count_words, create_pdf
+    from api_client import SUMMARIZER_API_URL, summarize_remote
+    from batch import read_urls, iter_batch, results_to_csv, results_to_jsonl
+    from ui_components import display_youtube_video_info, render_visual_mindmap, setup_whatsapp_sharing_ui
+    from audio_utils import create_audio_with_fallback, mp3_duration
+
     st.success(f"Welcome, {st.session_state['username']}!")
     
     # Theme toggle in sidebar using custom button
     st.sidebar.title("App Settings")
     theme_toggle_button()
+
+    def reset_mindmap():
+        """Drop the current mind map so it is rebuilt with the newly selected style."""
+        st.session_state.mindmap_data = None
+        st.session_state.artifact_memo = {key: value for key, value in st.session_state.get("artifact_memo", {}).items()
+                                          if key[0] != "mindmap"}
+
+    if "mindmap_backend" not in st.session_state:
+        st.session_state.mindmap_backend = MINDMAP_BACKEND
+    st.sidebar.selectbox("Mind map style", list(MINDMAP_BACKENDS), format_func=MINDMAP_BACKENDS.get,
+                         key="mindmap_backend", on_change=reset_mindmap,
+                         help="Fast builds the mind map from the summary's keywords; Detailed asks the AI model (always used for Chinese and Japanese)")
     # Theme toggle in sidebar using custom button
 
 # Add logout button to sidebar
@@ -401,29 +422,23 @@ else:
    # Summarizer App Content Starts Here
     # -------------------------------
     
-    # Supported languages dictionary with their codes
-    LANGUAGES = {
-        "English": "en",
-        "Hindi": "hi",
-        "Spanish": "es",
-        "French": "fr",
-        "German": "de",
-        "Chinese": "zh",
-        "Japanese": "ja",
-        "Korean": "ko",
-        "Russian": "ru",
-        "Arabic": "ar",
-        "Bengali": "bn",
-        "Tamil": "ta",
-        "Telugu": "te"
+    # Artifacts produced after a summary, with their display names and session state keys
+    ARTIFACT_STAGES = {
+        "mindmap": "Mind map",
+        "audio": "Audio",
+        "pdf": "PDF",
     }
-
-    # Summary length options
-    SUMMARY_LENGTHS = {
-        "Short (150 words)": 150,
-        "Medium (250 words)": 250,
-        "Long (300 words)": 300
+    ARTIFACT_STATE_KEYS = {
+        "mindmap": "mindmap_data",
+        "audio": "audio_file",
+        "pdf": "pdf_bytes",
     }
+    ARTIFACT_TOGGLE_LABELS = {
+        "mindmap": "🧠 Show mind map",
+        "audio": "🔊 Listen to summary",
+        "pdf": "📄 Prepare PDF",
+    }
+
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "summary" not in st.session_state:
@@ -490,710 +505,45 @@ else:
 
         st.session_state.url = url_input
 
-    def is_youtube_url(url: str) -> bool:
-        """Check if the URL is a YouTube video URL."""
-        youtube_domains = ['youtube.com', 'youtu.be']
-        parsed_url = urlparse(url)
-        return any(domain in parsed_url.netloc for domain in youtube_domains)
-    def extract_youtube_video_id(url: str) -> str: 
-        """Extract the video ID from a YouTube URL."""
-        parsed_url = urlparse(url)
-    
-        if parsed_url.netloc == 'youtu.be':
-            return parsed_url.path[1:]
-        
-        if parsed_url.netloc in ('www.youtube.com', 'youtube.com'):
-            if parsed_url.path == '/watch':
-                return parse_qs(parsed_url.query)['v'][0]
-            elif parsed_url.path.startswith('/embed/'):
-                return parsed_url.path.split('/')[2]
-            elif parsed_url.path.startswith('/v/'):
-                return parsed_url.path.split('/')[2]
-        
-        # Could not extract ID
-            return None
-    def get_youtube_video_details(url: str) -> dict:
-        """Get title, thumbnail, and channel details for a YouTube video."""
-        try:
-            video_id = extract_youtube_video_id(url)
-            
-            if not video_id:
-                return {
-                    "title": "Unknown Title",
-                    "thumbnail": None,
-                    "channel": "Unknown Channel",
-                    "success": False
-                }
-            
-            # Use yt_dlp to get video info
-            ydl_opts = {
-                'quiet': True,
-                'skip_download': True,
-                'no_warnings': True,
-                'youtube_include_dash_manifest': False
-            }
-            
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                return {
-                    "title": info.get("title", "Unknown Title"),
-                    "thumbnail": info.get("thumbnail", None),
-                    "channel": info.get("uploader", "Unknown Channel"),
-                    "channel_url": info.get("uploader_url", None),
-                    "duration": info.get("duration", 0),
-                    "view_count": info.get("view_count", 0),
-                    "upload_date": info.get("upload_date", "Unknown"),
-                    "success": True
-                }
-        
-        except Exception as e:
-            logger.error(f"Error getting YouTube details: {str(e)}", exc_info=True)
-            return {
-                "title": "Error retrieving video details",
-                "thumbnail": None,
-                "channel": "Unknown",
-                "success": False
-            }
-
-    def display_youtube_video_info(url: str):
-        """Display YouTube video information in the Streamlit UI."""
-    st.subheader("Video Information")
-    
-    with st.spinner("Retrieving video details..."):
-        video_details = get_youtube_video_details(url_input)
-        
-        if video_details["success"]:
-            # Create columns for layout
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                # Display thumbnail
-                if video_details["thumbnail"]:
-                    st.image(video_details["thumbnail"], use_container_width=True)
-                else:
-                    st.info("Thumbnail not available")
-            
-            with col2:
-                # Display video details
-                st.markdown(f"**Title:** {video_details['title']}")
-                st.markdown(f"**Channel:** {video_details['channel']}")
-                
-                # Display additional details if available
-                if video_details.get("view_count"):
-                    st.markdown(f"**Views:** {video_details['view_count']:,}")
-                
-                if video_details.get("duration"):
-                    minutes = video_details['duration'] // 60
-                    seconds = video_details['duration'] % 60
-                    st.markdown(f"**Duration:** {minutes} min {seconds} sec")
-                
-                if video_details.get("upload_date"):
-                    date = video_details["upload_date"]
-                    try:
-                        # Format date if it's in YYYYMMDD format
-                        formatted_date = f"{date[0:4]}-{date[4:6]}-{date[6:8]}"
-                        st.markdown(f"**Upload Date:** {formatted_date}")
-                    except:
-                        st.markdown(f"**Upload Date:** {date}")
-                
-                # Add link to channel
-                if video_details.get("channel_url"):
-                    st.markdown(f"[Visit Channel]({video_details['channel_url']})")
-            
-            # Add a divider
-            st.markdown("---")
-        
     # Show URL type if URL is entered
     if url_input:
         url_type = "YouTube video" if is_youtube_url(url_input) else "website"
         st.info(f"Detected URL type: {url_type}")
 
-    # Initialize LLM
-    llm = ChatGroq(
-        model="mixtral-8x7b-32768",
-        groq_api_key=os.getenv("GROQ_API_KEY")
-    )
-
-    # Summary prompt template
-    SUMMARY_PROMPT = """
-    Create a comprehensive summary of the following content directly in {language}.
-    The summary should be exactly {word_count} words long.
-
-    Content: {text}
+    # Shared LLM gateway; built once per process, not on every rerun
+    llm = get_llm()
 
-    Requirements:
-    1. Generate the summary DIRECTLY in {language}
-    2. Make it exactly {word_count} words
-    3. Maintain natural and fluent language
-    4. Use appropriate script for the language (e.g., Devanagari for Hindi)
-    5. Focus on key points and main ideas
-    """
-
-    prompt = PromptTemplate(template=SUMMARY_PROMPT, input_variables=["text", "language", "word_count"])
-    # ------ VISUAL MINDMAP GENERATOR FUNCTIONS ------
-    def generate_mindmap_data(llm, summary, title="Content Summary"):
-        """
-        Generate a visual mind map structure from a summary using an LLM.
-        
-        Args:
-            llm: Language model to use
-            summary: Text summary to convert into a mind map
-            title: Central node title
-            
-        Returns:
-            JSON data for the mind map
-        """
-        # Template for mind map generation
-        mindmap_template = """
-        Analyze the following summary and create a visual mind map structure in JSON format.
-        
-        SUMMARY:
-        {summary}
-    
-        TASK:
-        Extract the most important concepts from the summary and organize them into a visual mind map structure.
-        
-        The mind map should be structured with:
-        1. A central node (the main topic: "{title}")
-        2. 4-6 main branches (primary concepts/themes from the summary)
-        3. 2-4 sub-branches per main branch (supporting details, examples, or sub-concepts)
-        
-        INSTRUCTIONS:
-        - Keep node text concise (3-5 words max per node)
-        - Choose visually distinct concepts for main branches
-        - Use short, impactful phrases
-        - Create a balanced structure
-        
-        RESPONSE FORMAT:
-        Return ONLY a JSON object structured like this:
-        {{
-        "root": {{
-            "name": "Main Topic",
-            "children": [
-            {{
-                "name": "Branch 1",
-                "children": [
-                {{"name": "Sub-topic 1.1"}},
-                {{"name": "Sub-topic 1.2"}}
-                ]
-            }},
-            {{
-                "name": "Branch 2",
-                "children": [
-                {{"name": "Sub-topic 2.1"}},
-                {{"name": "Sub-topic 2.2"}}
-                ]
-            }}
-            ]
-        }}
-        }}
-        
-        Return ONLY the valid JSON object, nothing else.
-        """
-    
-        prompt = PromptTemplate(
-            input_variables=["summary", "title"],
-            template=mindmap_template
-        )
-    
-        # Create and run the chain
-        chain = LLMChain(llm=llm, prompt=prompt)
-        result = chain.run(summary=summary, title=title)
-        
-        # Clean the result to ensure it's valid JSON
-        result = result.strip()
-        # Remove any markdown code blocks if present
-        result = re.sub(r'```json\s*|\s*```', '', result)
-        result = re.sub(r'```\s*|\s*```', '', result)
-        
-        try:
-            # Parse the JSON
-            mindmap_data = json.loads(result)
-            return mindmap_data
-        except json.JSONDecodeError as e:
-            # If JSON is invalid, create a simple structure
-            return {
-                "root": {
-                    "name": title,
-                    "children": [
-                        {"name": "Key Point 1", "children": [{"name": "Detail 1.1"}, {"name": "Detail 1.2"}]},
-                        {"name": "Key Point 2", "children": [{"name": "Detail 2.1"}, {"name": "Detail 2.2"}]}
-                    ]
-                }
-            }
+    # Initialize session state for the chat
 
-    def render_visual_mindmap(mindmap_data, height=500):
-        """
-        Render a visual mind map in Streamlit using D3.js.
-        
-        Args:
-            mindmap_data: JSON data for the mind map
-            height: Height of the rendered component
-        """
-        # Generate a unique ID for this mindmap
-        mindmap_id = "mindmap_" + hashlib.md5(str(datetime.now()).encode()).hexdigest()[:8]
+    def store_summary_result(result: dict, language: str, length: str, history_entry=None):
+        """Make a finished summary the current one and reset its artifacts."""
+        # Store summary and metadata in session state
+        st.session_state["summary"] = result["summary"]
+        st.session_state["url"] = result["url"]
+        st.session_state["summary_generated"] = True
+        st.session_state.selected_language = language
+        st.session_state.selected_length = length
         
-        # Convert the mindmap data to a JSON string
-        mindmap_json = json.dumps(mindmap_data)
-        
-        # D3.js and custom styling for the mindmap
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <script src="https://d3js.org/d3.v7.min.js"></script>
-            <style>
-                #{mindmap_id} {{
-                    width: 100%;
-                    height: {height}px;
-                    overflow: hidden;
-                    margin: 0 auto;
-                    font-family: Arial, sans-serif;
-                }}
-                .node circle {{
-                    fill: #fff;
-                    stroke: #4682B4;
-                    stroke-width: 3px;
-                    cursor: pointer;
-                }}
-                .node text {{
-                    font: 14px sans-serif;
-                }}
-                .link {{
-                    fill: none;
-                    stroke: #ccc;
-                    stroke-width: 2px;
-                }}
-                .root-node circle {{
-                    fill: #4682B4;
-                    stroke: #2E5984;
-                    stroke-width: 3px;
-                }}
-                .root-node text {{
-                    font-weight: bold;
-                    font-size: 16px;
-                }}
-                .main-branch circle {{
-                    fill: #fff;
-                    stroke: #5F9EA0;
-                    stroke-width: 2.5px;
-                }}
-                .sub-branch circle {{
-                    fill: #fff;
-                    stroke: #87CEEB;
-                    stroke-width: 2px;
-                }}
-                .tooltip {{
-                    position: absolute;
-                    text-align: center;
-                    padding: 8px;
-                    font: 12px sans-serif;
-                    background: #f9f9f9;
-                    border: 1px solid #ccc;
-                    border-radius: 5px;
-                    pointer-events: none;
-                    opacity: 0;
-                    transition: opacity 0.3s;
-                }}
-            </style>
-        </head>
-        <body>
-            <div id="{mindmap_id}"></div>
-            <script>
-            (function() {{
-                // Parse the data
-                const data = {mindmap_json};
-                
-                // Set up the SVG container
-                const width = document.getElementById('{mindmap_id}').clientWidth;
-                const height = {height};
-                const margin = {{top: 20, right: 90, bottom: 20, left: 90}};
-                
-                // Create a tooltip div
-                const tooltip = d3.select("#{mindmap_id}")
-                    .append("div")
-                    .attr("class", "tooltip");
-                
-                const svg = d3.select("#{mindmap_id}")
-                    .append("svg")
-                    .attr("width", width)
-                    .attr("height", height)
-                    .append("g")
-                    .attr("transform", `translate(${{margin.left}},${{margin.top}})`);
-                
-                // Create a tree layout
-                const treeWidth = width - margin.left - margin.right;
-                const treeHeight = height - margin.top - margin.bottom;
-                const treeLayout = d3.tree().size([treeHeight, treeWidth]);
-                
-                // Create a hierarchy from the data
-                const root = d3.hierarchy(data.root);
-                
-                // Assign position to nodes
-                treeLayout(root);
-                
-                // Create links
-                svg.selectAll(".link")
-                    .data(root.links())
-                    .join("path")
-                    .attr("class", "link")
-                    .attr("d", d3.linkHorizontal()
-                        .x(d => d.y)
-                        .y(d => d.x)
-                    );
-                
-                // Create nodes
-                const node = svg.selectAll(".node")
-                    .data(root.descendants())
-                    .join("g")
-                    .attr("class", d => {{
-                        if (d.depth === 0) return "node root-node";
-                        if (d.depth === 1) return "node main-branch";
-                        return "node sub-branch";
-                    }})
-                    .attr("transform", d => `translate(${{d.y}},${{d.x}})`)
-                    .on("mouseover", function(event, d) {{
-                        tooltip.transition()
-                            .duration(200)
-                            .style("opacity", .9);
-                        tooltip.html(d.data.name)
-                            .style("left", (event.pageX) + "px")
-                            .style("top", (event.pageY - 28) + "px");
-                    }})
-                    .on("mouseout", function(d) {{
-                        tooltip.transition()
-                            .duration(500)
-                            .style("opacity", 0);
-                    }});
-                
-                // Add circles to nodes
-                node.append("circle")
-                    .attr("r", d => d.depth === 0 ? 25 : (d.depth === 1 ? 15 : 10));
-                
-                // Add text labels
-                node.append("text")
-                    .attr("dy", ".35em")
-                    .attr("x", d => d.children ? -13 : 13)
-                    .style("text-anchor", d => d.children ? "end" : "start")
-                    .text(d => d.data.name);
-                
-                // Add zoom capability
-                const zoom = d3.zoom()
-                    .scaleExtent([0.5, 2])
-                    .on("zoom", (event) => {{
-                        svg.attr("transform", event.transform);
-                    }});
-                
-                d3.select("#{mindmap_id} svg")
-                    .call(zoom);
-            }})();
-            </script>
-        </body>
-        </html>
-        """
-        
-        # Render the HTML
-        components.html(html, height=height+50)
-
-    # ------ END OF VISUAL MINDMAP GENERATOR FUNCTIONS ------
-
-    # IMPROVED AUDIO GENERATION FUNCTION WITH BETTER ERROR HANDLING
-    def create_audio(text: str, language_code: str) -> str:
-        """Create audio file from text using gTTS with enhanced error handling."""
-        try:
-            logger.info(f"Starting audio generation for language: {language_code}")
-            temp_dir = tempfile.mkdtemp()
-            temp_path = os.path.join(temp_dir, "summary_audio.mp3")
-            
-            # Add a timeout parameter and retry mechanism
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    logger.info(f"TTS attempt {attempt+1}/{max_retries}")
-                    
-                    # Configure a session with appropriate timeouts
-                    session = requests.Session()
-                    session.mount('https://', requests.adapters.HTTPAdapter(
-                        max_retries=3,
-                        pool_connections=1,
-                        pool_maxsize=1
-                    ))
-                    
-                    # Use the session for gTTS
-                    tts = gTTS(text=text, lang=language_code, slow=False)
-                    tts.save(temp_path)
-                    
-                    # Verify file was created
-                    if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
-                        logger.info(f"Audio file created successfully: {temp_path}")
-                        return temp_path
-                    else:
-                        logger.warning("Audio file was created but is empty or doesn't exist")
-                        
-                except requests.exceptions.RequestException as req_err:
-                    logger.warning(f"Request error on attempt {attempt+1}: {req_err}")
-                    if attempt < max_retries - 1:
-                        wait_time = 2 * (attempt + 1)  # Exponential backoff
-                        logger.info(f"Waiting {wait_time} seconds before retrying...")
-                        time.sleep(wait_time)
-                    else:
-                        raise req_err
-                        
-            logger.error("All TTS attempts failed")
-            return None
-            
-        except requests.exceptions.ConnectionError as conn_err:
-            logger.error(f"Connection error: {conn_err}")
-            st.error("Failed to connect to Google TTS service. Please check your internet connection.")
-        except requests.exceptions.Timeout as timeout_err:
-            logger.error(f"Timeout error: {timeout_err}")
-            st.error("Connection to Google TTS service timed out. Please try again later.")
-        except Exception as e:
-            logger.error(f"General error in create_audio: {str(e)}", exc_info=True)
-            st.error(f"Error generating audio: {str(e)}")
-        
-        return None
+        # Title for sharing comes from the same fetch that produced the content
+        st.session_state.content_title = result["title"]
 
-    # FALLBACK OFFLINE TTS FUNCTION
-    def create_audio_offline(text: str) -> str:
-        """Create audio file using pyttsx3 (offline TTS) as a fallback."""
-        try:
-            # First check if pyttsx3 is installed
-            try:
-                import pyttsx3
-            except ImportError:
-                st.warning("Offline TTS requires pyttsx3. Installing...")
-                os.system("pip install pyttsx3")
-                import pyttsx3
-                
-            logger.info("Generating audio using offline TTS engine")
-            temp_dir = tempfile.mkdtemp()
-            temp_path = os.path.join(temp_dir, "summary_audio.mp3")
-            
-            engine = pyttsx3.init()
-            engine.setProperty('rate', 150)  # Speed
-            
-            # Save to file
-            engine.save_to_file(text, temp_path)
-            engine.runAndWait()
-            
-            if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
-                logger.info("Offline audio generation successful")
-                return temp_path
-            else:
-                logger.warning("Offline audio file was not created properly")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error in offline TTS: {str(e)}", exc_info=True)
-            st.error(f"Error generating offline audio: {str(e)}")
-            return None
-
-    # COMBINED AUDIO GENERATION WITH FALLBACK
-    def create_audio_with_fallback(text: str, language_code: str) -> str:
-        """Try online TTS first, then fall back to offline TTS if needed."""
-        # Try online gTTS first
-        audio_path = create_audio(text, language_code)
-        if audio_path:
-            return audio_path
-            
-        # If online TTS fails and language is English, try offline TTS
-        if language_code == "en":
-            st.warning("Online TTS failed. Trying offline TTS instead...")
-            return create_audio_offline(text)
+        # Artifacts for the new summary are generated on demand below
+        st.session_state.mindmap_data = None
+        st.session_state.audio_file = None
+        st.session_state.pdf_bytes = None
+        st.session_state.stage_timings = {}
+
+        if history_entry is None:
+            # Keep every new summary in the user's history so it can be reopened without the LLM
+            timings = {"summary": result["elapsed"]} if result.get("elapsed") else {}
+            st.session_state.history_id = save_summary(
+                st.session_state["username"], result, language, length, timings=timings
+            )
+            st.session_state.history_timings = timings
         else:
-            st.warning("Online TTS failed. Offline TTS only supports English.")
-            # Try English TTS as last resort if original language fails
-            if language_code != "en":
-                st.info("Attempting English TTS as fallback...")
-                return create_audio(text, "en")
-            
-        return None
-
-    def load_youtube_content(url: str) -> str:
-        """Extract YouTube content as text using yt_dlp."""
-        try:
-            ydl_opts = {'format': 'bestaudio/best', 'quiet': True}
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                title = info.get("title", "Video")
-                description = info.get("description", "No description available.")
-                return f"{title}\n\n{description}"
-        except Exception as e:
-            logger.error(f"YouTube extraction error: {str(e)}", exc_info=True)
-            raise Exception(f"Error extracting YouTube content: {str(e)}")
-
-    def extract_website_content(url: str) -> str:
-        """Extract main content from a website using BeautifulSoup."""
-        try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            
-            # Use a session with timeout
-            session = requests.Session()
-            response = session.get(url, headers=headers, timeout=15, verify=True)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'header', 'footer', 'iframe']):
-                element.decompose()
-            
-            # Extract title
-            title = soup.title.string if soup.title else ""
-            
-            # Extract main content
-            main_content = []
-            
-            # Check for article or main content
-            content_elements = soup.find_all(['article', 'main', 'div.content', 'div.post'])
-            if content_elements:
-                for element in content_elements:
-                    main_content.append(element.get_text(strip=True, separator=' '))
-            else:
-                # Fallback to paragraphs if no main content container found
-                paragraphs = soup.find_all('p')
-                main_content = [p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 50]
-            
-            return f"{title}\n\n{' '.join(main_content)}"
-        
-        except requests.exceptions.SSLError:
-            # Try again without SSL verification as fallback
-            logger.warning(f"SSL Error for {url}, retrying without verification")
-            response = requests.get(url, headers=headers, verify=False, timeout=15)
-            # Continue with the same processing as above
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # Rest of the processing (same as above)
-            for element in soup(['script', 'style', 'nav', 'header', 'footer', 'iframe']):
-                element.decompose()
-            title = soup.title.string if soup.title else ""
-            main_content = []
-            content_elements = soup.find_all(['article', 'main', 'div.content', 'div.post'])
-            if content_elements:
-                for element in content_elements:
-                    main_content.append(element.get_text(strip=True, separator=' '))
-            else:
-                paragraphs = soup.find_all('p')
-                main_content = [p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 50]
-            return f"{title}\n\n{' '.join(main_content)}"
-            
-        except Exception as e:
-            logger.error(f"Website extraction error: {str(e)}", exc_info=True)
-            raise Exception(f"Error extracting website content: {str(e)}")
-
-    def get_content(url: str) -> list[Document]:
-        """Load content from URL based on its type."""
-        try:
-            if is_youtube_url(url):
-                text_content = load_youtube_content(url)
-            else:
-                text_content = extract_website_content(url)
-            
-            # Clean the text content
-            text_content = re.sub(r'\s+', ' ', text_content).strip()
-            text_content = re.sub(r'[^\w\s.,!?-]', '', text_content)
-            
-            return [Document(page_content=text_content)]
-        
-        except Exception as e:
-            logger.error(f"Error in get_content: {str(e)}", exc_info=True)
-            raise Exception(f"Error loading content: {str(e)}")
-
-    def count_words(text: str) -> int:
-        """Count words in text, handling multiple languages."""
-        text = re.sub(r'http\S+|www.\S+', '', text)
-        words = [word for word in text.split() if word.strip()]
-        return len(words)
-
-    def create_pdf(summary: str, url: str, language: str, length: str) -> bytes:
-        """Create a PDF document containing the summary."""
-        pdf = FPDF()
-        pdf.add_page()
-        
-        # Add header
-        pdf.set_font('Arial', 'B', 16)
-        pdf.cell(0, 10, 'Content Summary Report', ln=True, align='C')
-        
-        # Add metadata
-        pdf.set_font('Arial', '', 12)
-        pdf.line(10, 30, 200, 30)
-        pdf.ln(15)
-        
-        # Add summary details
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 10, 'Summary Details:', ln=True)
-        pdf.set_font('Arial', '', 12)
-        pdf.cell(0, 10, f'Source URL: {url}', ln=True)
-        pdf.cell(0, 10, f'Language: {language}', ln=True)
-        pdf.cell(0, 10, f'Summary Length: {length}', ln=True)
-        pdf.cell(0, 10, f'Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', ln=True)
-        
-        # Add summary content
-        pdf.ln(10)
-        pdf.set_font('Arial', 'B', 12)
-        pdf.cell(0, 10, 'Summary:', ln=True)
-        pdf.set_font('Arial', '', 12)
-        
-        pdf.multi_cell(0, 10, summary)
-        
-        return pdf.output(dest='S').encode('latin1')
-
-    def get_whatsapp_share_link(title, summary, source_url):
-        """Generate WhatsApp sharing link."""
-        # Create a share text
-        whatsapp_text = f"📚 Summary of: {title}\n\n{summary}\n\nOriginal content: {source_url}"
-        whatsapp_link = f"https://wa.me/?text={quote(whatsapp_text)}"
-        
-        return whatsapp_link
-
-    def setup_whatsapp_sharing_ui(title, summary, url):
-        """Set up the WhatsApp sharing UI section"""
-        st.subheader("Share Summary:")
-        
-        # Generate WhatsApp sharing link
-        whatsapp_link = get_whatsapp_share_link(
-            title=title,
-            summary=summary,
-            source_url=url
-        )
-        
-        
-        st.markdown("### Share to WhatsApp")
-        st.markdown("This will share the complete summary with the original link.")
-        whatsapp_preview = f"""
-        📱 WhatsApp Preview:
-        
-        📚 Summary of: {title}
-        
-        {summary[:150]}...
-        
-        Original content: {url}
-        
-        """
-        st.markdown(whatsapp_preview)
-        st.markdown(f"[![Share on WhatsApp](https://img.shields.io/badge/Share_on-WhatsApp-25D366?style=for-the-badge&logo=whatsapp&logoColor=white)]({whatsapp_link})")
-        st.markdown("---")
-            
-        # Add copy functionality for complete summary
-        st.subheader("Copy Full Summary")
-        full_share_text = f"""📚 Summary of: {title}
-
-    {summary}
-
-    Original content: {url}
-
-    Generated by Multi-Source Content Summarizer"""
-        
-        st.code(full_share_text, language="markdown")
-        st.button("📋 Copy to Clipboard", 
-                on_click=lambda: st.write("Summary copied to clipboard!"),
-                help="Copy the full summary to paste manually into any platform")
-
-    # Initialize session state for the chat
+            st.session_state.history_id = history_entry["id"]
+            st.session_state.history_timings = history_entry["timings"]
+            st.session_state.mindmap_data = history_entry["mindmap"]
 
     # Summarization Process
     if st.button("Summarize"):
@@ -1207,102 +557,299 @@ else:
                 if is_youtube_url(url_input):
                     display_youtube_video_info(url_input)
                 word_count = SUMMARY_LENGTHS[selected_length]
-                with st.spinner(f"Creating {selected_length.lower()} summary in {selected_language}..."):
-                    docs = get_content(url_input)
-                    
-                    chain = load_summarize_chain(
-                        llm, 
-                        chain_type="stuff",
-                        prompt=prompt.partial(
-                            language=selected_language,
-                            word_count=word_count
-                        )
-                    )
-                    summary = chain.run(docs)
-                    # Store summary and metadata in session state
-                    st.session_state["summary"] = summary
-                    st.session_state["url"] = url_input
-                    st.session_state["summary_generated"] = True
-                    st.session_state.selected_language = selected_language
-                    st.session_state.selected_length = selected_length
-                    
-                    # Extract title for sharing
-                    if is_youtube_url(url_input):
-                        try:
-                            with YoutubeDL({'quiet': True}) as ydl:
-                                info = ydl.extract_info(url_input, download=False)
-                                content_title = info.get("title", "YouTube Content")
-                        except:
-                            content_title = "YouTube Content"
-                    else:
-                        try:
-                            response = requests.get(url_input, timeout=5)
-                            soup = BeautifulSoup(response.text, 'html.parser')
-                            content_title = soup.title.string if soup.title else "Web Content"
-                        except:
-                            content_title = "Web Content"
-                    
-                    st.session_state.content_title = content_title
-                    with st.spinner("Creating visual mind map..."):
-                        try:
-                            mindmap_data = generate_mindmap_data(
-                                llm=llm,
-                                summary=summary,
-                                title=content_title[:30] if len(content_title) > 30 else content_title
+                if JOB_QUEUE_ENABLED and not SUMMARIZER_API_URL:
+                    # Hand the work to a background worker; progress is polled below
+                    job_id = get_job_queue().enqueue("summarize", {
+                        "url": url_input,
+                        "language": selected_language,
+                        "word_count": word_count,
+                        "length": selected_length,
+                    }, dedupe_key=summary_job_key(url_input, selected_language, word_count))
+                    st.session_state.job_id = job_id
+                    # Keep the job in the URL so a reconnecting browser picks it up again
+                    st.query_params["job"] = job_id
+                else:
+                    with st.spinner(f"Creating {selected_length.lower()} summary in {selected_language}..."):
+                        if SUMMARIZER_API_URL:
+                            # Summarization runs on the headless service
+                            result = summarize_remote(url_input, selected_language, word_count)
+                        else:
+                            # Render tokens as they arrive; the full summary is shown below once done
+                            stream_box = st.empty()
+                            streamed = []
+
+                            def show_token(token):
+                                streamed.append(token)
+                                stream_box.markdown("".join(streamed) + "▌")
+
+                            result = summarize_url(
+                                url_input, selected_language, word_count,
+                                llm=llm, cache=get_summary_cache(), on_token=show_token
                             )
-                            st.session_state.mindmap_data = mindmap_data
-                        except Exception as e:
-                            st.warning(f"Could not generate mind map: {str(e)}")
-                    #Generate audio for the summary
-                    with st.spinner("Generating audio..."):
-                            audio_file = create_audio(summary, LANGUAGES[selected_language])
-                            if audio_file:
-                                st.session_state.audio_file = audio_file           
-                        # Create PDF bytes
-                    pdf_bytes = create_pdf(
-                            summary=summary,
-                            url=url_input,
-                            language=selected_language,
-                            length=selected_length
-                        )
-                    st.session_state.pdf_bytes = pdf_bytes
+                            stream_box.empty()
+                        store_summary_result(result, selected_language, selected_length)
             except Exception as e:
                 st.exception(f"An error occurred: {e}")
+
+    # Resume polling a queued job after a rerun or reconnect
+    if "job_id" not in st.session_state:
+        st.session_state.job_id = st.query_params.get("job")
+
+    @st.fragment(run_every=JOB_POLL_INTERVAL * 2)
+    def show_job_progress():
+        job = get_job_queue().get(st.session_state.job_id)
+        if job is None:
+            st.session_state.job_id = None
+            st.query_params.pop("job", None)
+            return
+        if job["status"] in ACTIVE_STATUSES:
+            st.info(f"Summary job {job['status']}... you can keep using the page.")
+            if job["partial"]:
+                st.markdown(job["partial"] + "▌")
+            return
+
+        st.session_state.job_id = None
+        st.query_params.pop("job", None)
+        if job["status"] == "done":
+            payload = job["payload"]
+            # Jobs joined from the API carry no length label; recover it from the word count
+            length = payload.get("length") or next(
+                (name for name, count in SUMMARY_LENGTHS.items() if count == payload["word_count"]),
+                selected_length
+            )
+            store_summary_result(job["result"], payload["language"], length)
+        else:
+            st.session_state.job_error = job["error"]
+        st.rerun()
+
+    if st.session_state.job_id:
+        show_job_progress()
+    if st.session_state.get("job_error"):
+        st.error(f"An error occurred: {st.session_state.pop('job_error')}")
 # Always display summary if it exists in session state
     if st.session_state.summary_generated:
         st.subheader(f"Summary in {st.session_state.selected_language}:")
         st.success(st.session_state.summary)
         actual_word_count = count_words(st.session_state.summary)
         st.info(f"Word count: {actual_word_count} words")
+
+    def render_mindmap_section():
+        if st.session_state.mindmap_data:
+            st.subheader("Mind Map Visualization:")
+            render_visual_mindmap(st.session_state.mindmap_data, height=500)
+            
+            # Add explanation and instructions
+            st.info("📋 This interactive mind map shows the key concepts from the summary. You can zoom and pan to explore, and hover over nodes for details.")
+            st.caption("Tip: Click and drag to move around, scroll to zoom in/out.")
+
     # Display audio player if audio file exists
-    if st.session_state.mindmap_data:
-        st.subheader("Mind Map Visualization:")
-        render_visual_mindmap(st.session_state.mindmap_data, height=500)
-        
-        # Add explanation and instructions
-        st.info("📋 This interactive mind map shows the key concepts from the summary. You can zoom and pan to explore, and hover over nodes for details.")
-        st.caption("Tip: Click and drag to move around, scroll to zoom in/out.")
-        
-    if st.session_state.audio_file:
-        st.subheader("Listen to Summary:")
-        st.audio(st.session_state.audio_file, format='audio/mp3')
+    def render_audio_section():
+        if st.session_state.audio_file:
+            st.subheader("Listen to Summary:")
+            st.audio(st.session_state.audio_file, format='audio/mp3')
+
     # Display PDF download button if PDF bytes exist
-    if st.session_state.pdf_bytes:
-        st.download_button(
-            label="Download Summary as PDF",
-            data=st.session_state.pdf_bytes,
-            file_name=f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-            mime="application/pdf",
-            key="pdf_download"
-        )
+    def render_pdf_section():
+        if st.session_state.pdf_bytes:
+            st.download_button(
+                label="Download Summary as PDF",
+                data=st.session_state.pdf_bytes,
+                file_name=f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+                mime="application/pdf",
+                key="pdf_download"
+            )
+
+    # Shared across sessions: the same summary never pays for an artifact twice
+    @st.cache_data(max_entries=200, show_spinner=False)
+    def cached_mindmap_data(summary, title, backend, language, _llm):
+        return generate_mindmap_data(llm=_llm, summary=summary, title=title, backend=backend, language=language)
+
+    # Stages whose output was already shown while it was being produced
+    streamed_stages = set()
+
+    def stream_audio(summary, language_code):
+        """Voice the summary, playing the first sentences while the rest are still being synthesized."""
+        slot = artifact_slots["audio"]
+        parts = []
+        player = None
+        started = None
+
+        def show_segment(segment):
+            nonlocal player, started
+            if player is None:
+                slot.subheader("Listen to Summary:")
+                player = slot.empty()
+                started = time.monotonic()
+                streamed_stages.add("audio")
+            # One player whose track grows: it is re-rendered with everything so far and resumes
+            # where playback is now (or at the end of the part already heard, if that ran out)
+            position = min(time.monotonic() - started, mp3_duration(b"".join(parts)))
+            parts.append(segment)
+            player.audio(b"".join(parts), format='audio/mp3', autoplay=True, start_time=int(position))
+
+        # Repeats come straight from the on-disk audio cache as a single segment
+        return create_audio_with_fallback(summary, language_code, on_segment=show_segment)
+
+    @st.cache_data(max_entries=200, show_spinner=False)
+    def cached_pdf(summary, url, language, length):
+        return create_pdf(summary=summary, url=url, language=language, length=length)
+
+    def build_artifact_stages(names) -> dict:
+        """Return the zero-argument callables that produce the requested artifacts."""
+        summary = st.session_state.summary
+        title = st.session_state.content_title
+        mindmap_backend = st.session_state.mindmap_backend
+        builders = {
+            "mindmap": lambda: cached_mindmap_data(
+                summary,
+                title[:30] if len(title) > 30 else title,
+                mindmap_backend,
+                st.session_state.selected_language,
+                llm
+            ),
+            "audio": lambda: stream_audio(summary, LANGUAGES[st.session_state.selected_language]),
+            "pdf": lambda: cached_pdf(
+                summary,
+                st.session_state.url,
+                st.session_state.selected_language,
+                st.session_state.selected_length
+            ),
+        }
+        return {name: builders[name] for name in names}
+
+    def current_summary_key() -> str:
+        """Hash identifying the summary that artifacts are generated for."""
+        parts = [st.session_state.summary, st.session_state.url,
+                 st.session_state.selected_language, st.session_state.selected_length]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    if st.session_state.summary_generated:
+        # Artifacts are only generated when the user asks for them
+        st.subheader("Extras:")
+        toggle_cols = st.columns(len(ARTIFACT_STAGES))
+        for col, (name, label) in zip(toggle_cols, ARTIFACT_TOGGLE_LABELS.items()):
+            with col:
+                st.toggle(label, key=f"show_{name}")
+        requested = [name for name in ARTIFACT_STAGES if st.session_state.get(f"show_{name}")]
+
+        # Reuse artifacts this session already generated for the same summary
+        if "artifact_memo" not in st.session_state:
+            st.session_state.artifact_memo = {}
+        summary_key = current_summary_key()
+        pending = []
+        for name in ARTIFACT_STAGES:
+            memo_key = (name, summary_key)
+            if name not in requested:
+                # Forget failures for hidden artifacts so toggling them on again retries
+                if memo_key in st.session_state.artifact_memo and st.session_state.artifact_memo[memo_key] is None:
+                    del st.session_state.artifact_memo[memo_key]
+            elif memo_key in st.session_state.artifact_memo:
+                if st.session_state.artifact_memo[memo_key]:
+                    st.session_state[ARTIFACT_STATE_KEYS[name]] = st.session_state.artifact_memo[memo_key]
+            elif not st.session_state[ARTIFACT_STATE_KEYS[name]]:
+                pending.append(name)
+    else:
+        requested = []
+        pending = []
+
+    # Reserve a slot per artifact so each one appears in place as soon as it is ready
+    artifact_slots = {name: st.container() for name in requested}
+    artifact_renderers = {
+        "mindmap": render_mindmap_section,
+        "audio": render_audio_section,
+        "pdf": render_pdf_section,
+    }
+
+    if pending:
+        # Let worker threads report errors into this session's page
+        script_ctx = get_script_run_ctx()
+        stage_timings = {}
+        wall_start = time.perf_counter()
+        with st.status(f"Preparing {', '.join(ARTIFACT_STAGES[name].lower() for name in pending)}...",
+                       expanded=False) as status:
+            for stage in run_stages(
+                build_artifact_stages(pending),
+                initializer=lambda: add_script_run_ctx(threading.current_thread(), script_ctx)
+            ):
+                stage_timings[stage.name] = stage.elapsed
+                label = ARTIFACT_STAGES[stage.name]
+                st.session_state.artifact_memo[(stage.name, summary_key)] = stage.result
+                if not stage.ok or not stage.result:
+                    status.write(f"⚠️ {label} could not be generated: {stage.error or 'no output'}")
+                    continue
+                st.session_state[ARTIFACT_STATE_KEYS[stage.name]] = stage.result
+                if stage.name == "mindmap" and st.session_state.get("history_id"):
+                    update_mindmap(st.session_state.history_id, stage.result)
+                status.write(f"✅ {label} ready in {stage.elapsed:.1f}s")
+                if stage.name in streamed_stages:
+                    # Already playing; the full track replaces the parts on the next rerun
+                    continue
+                with artifact_slots[stage.name]:
+                    artifact_renderers[stage.name]()
+            wall_time = time.perf_counter() - wall_start
+            status.update(label=f"Post-processing finished in {wall_time:.1f}s", state="complete")
+        st.session_state.stage_timings = {**st.session_state.get("stage_timings", {}), **stage_timings}
+        if st.session_state.get("history_id"):
+            st.session_state.history_timings = {**st.session_state.get("history_timings", {}), **stage_timings}
+            update_timings(st.session_state.history_id, st.session_state.history_timings)
+
+    # Render requested artifacts that were already available before this run
+    for name in requested:
+        if name not in pending:
+            with artifact_slots[name]:
+                artifact_renderers[name]()
+
+    if st.session_state.get("stage_timings"):
+        st.caption("Generation time: " + ", ".join(
+            f"{ARTIFACT_STAGES[name].lower()} {elapsed:.1f}s"
+            for name, elapsed in st.session_state.stage_timings.items()
+        ))
+
     # Display sharing UI
+    if st.session_state.summary_generated:
         setup_whatsapp_sharing_ui(
-        title=st.session_state.content_title,
-        summary=st.session_state.summary,
-        url=st.session_state.url,
+            title=st.session_state.content_title,
+            summary=st.session_state.summary,
+            url=st.session_state.url,
         )
-        current_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
+    # Batch mode: summarize many URLs at once
+    with st.expander("📦 Batch mode: summarize a list of URLs"):
+        st.write("Upload a CSV (with a `url` column) or a text file with one URL per line, or paste URLs below.")
+        batch_file = st.file_uploader("URL list", type=["csv", "txt"], key="batch_file")
+        batch_text = st.text_area("Or paste URLs (one per line)", key="batch_text")
+        if st.button("Summarize all", key="batch_run"):
+            batch_urls = read_urls(batch_file) if batch_file else read_urls(io.StringIO(batch_text))
+            if not batch_urls:
+                st.error("No valid URLs found.")
+            else:
+                progress = st.progress(0.0, text=f"Summarizing {len(batch_urls)} URLs...")
+                batch_results = []
+                for result in iter_batch(
+                    batch_urls,
+                    language=selected_language,
+                    word_count=SUMMARY_LENGTHS[selected_length],
+                    llm=llm,
+                    cache=get_summary_cache()
+                ):
+                    batch_results.append(result)
+                    progress.progress(len(batch_results) / len(batch_urls),
+                                      text=f"{len(batch_results)}/{len(batch_urls)} done")
+                st.session_state.batch_results = batch_results
+
+        if st.session_state.get("batch_results"):
+            batch_results = st.session_state.batch_results
+            failed = sum(1 for result in batch_results if result["error"])
+            st.info(f"{len(batch_results) - failed} summarized, {failed} failed")
+            st.dataframe([{k: r[k] for k in ("url", "title", "summary", "error")} for r in batch_results])
+            batch_col1, batch_col2 = st.columns(2)
+            with batch_col1:
+                st.download_button("Download JSONL", results_to_jsonl(batch_results),
+                                   file_name="summaries.jsonl", mime="application/json", key="batch_jsonl")
+            with batch_col2:
+                st.download_button("Download CSV", results_to_csv(batch_results),
+                                   file_name="summaries.csv", mime="text/csv", key="batch_csv")
+
     # Chat Interface
     st.markdown("<h3 class='chat-header'>Chat with AI</h3>", unsafe_allow_html=True)
     st.write(f"Ask any questions about the summary! (Responses will be in {st.session_state.selected_language})")
@@ -1321,11 +868,9 @@ else:
         context = f"""Based on this summary:\n\n{st.session_state.summary}\n\n
         Please provide the answer in {st.session_state.selected_language}.\n\n"""
         chat_prompt = f"{context}Answer this question: {user_input}"
-        with st.spinner("Thinking..."):
-            response = llm.invoke(chat_prompt).content
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            with st.chat_message("assistant"):
-                st.markdown(response)
+        with st.chat_message("assistant"):
+            response = st.write_stream(chunk.content for chunk in llm.stream(chat_prompt))
+        st.session_state.messages.append({"role": "assistant", "content": response})
     st.sidebar.header("Features Available")
     st.sidebar.write("""
     - Summarize YouTube videos and websites
@@ -1339,5 +884,32 @@ else:
     - Interactive chat interface
     - Dark/Light mode toggle with bulb icon
     """)
+    # Search and reopen past summaries
+    st.sidebar.header("Your Summaries")
+    history_query = st.sidebar.text_input("Search history", key="history_query",
+                                          placeholder="Words from a title, URL or summary")
+    history_results = search_history(st.session_state["username"], history_query, limit=10)
+    if not history_results:
+        st.sidebar.caption("No matching summaries." if history_query else "Summaries you create appear here.")
+    for entry in history_results:
+        label = entry["title"] or entry["url"]
+        label = label[:40] + "..." if len(label) > 40 else label
+        created = datetime.fromtimestamp(entry["created_at"]).strftime("%Y-%m-%d %H:%M")
+        if st.sidebar.button(f"{label} · {entry['language']} · {created}", key=f"history_{entry['id']}"):
+            history_entry = get_entry(st.session_state["username"], entry["id"])
+            if history_entry:
+                store_summary_result(history_entry, history_entry["language"], history_entry["length"],
+                                     history_entry=history_entry)
+                st.session_state.messages = []
+                st.rerun()
+
+    cache_stats = get_summary_cache().stats()
+    st.sidebar.caption(
+        f"Summary cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+        f"{cache_stats['entries']} stored"
+    )
     st.sidebar.markdown("---")
     st.sidebar.write("Developed with ❤️ by BATCH E17")
+
+# Rerun cost; every widget interaction and chat message pays it
+logger.debug(f"Script rerun took {(time.perf_counter() - rerun_start) * 1000:.1f} ms")
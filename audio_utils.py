@@ -0,0 +1,303 @@
+import io
+import os
+import re
+import time
+import random
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Text-to-speech settings (can be overridden through environment variables)
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "audio_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "300"))
+# The first chunk is kept short so progressive playback can start almost immediately
+TTS_FIRST_CHUNK_CHARS = int(os.getenv("TTS_FIRST_CHUNK_CHARS", "120"))
+TTS_MAX_RETRIES = int(os.getenv("TTS_MAX_RETRIES", "3"))
+# gTTS returns constant bitrate MP3 (32 kbps), so duration follows from size
+GTTS_BITRATE = 32000
+
+# Sentence ends in Latin, Devanagari/Bengali (danda), CJK and Arabic scripts
+SENTENCE_END = re.compile(r"(?<=[.!?।॥。！？؟])\s+|(?<=[。！？])")
+
+
+def split_sentences(text: str, max_chars: int = TTS_CHUNK_CHARS, first_chunk_chars: int = None) -> list[str]:
+    """
+    Split text into sentence-aligned chunks of at most max_chars characters.
+
+    If first_chunk_chars is given, the first chunk is limited to that size instead.
+    """
+    chunks = []
+    current = ""
+
+    def limit():
+        return first_chunk_chars if first_chunk_chars and not chunks else max_chars
+
+    for sentence in SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        # A single overlong sentence is split on word boundaries
+        while len(sentence) > limit():
+            if current:
+                chunks.append(current)
+                current = ""
+                continue
+            cut = sentence.rfind(" ", 0, limit())
+            cut = cut if cut > 0 else limit()
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > limit():
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class SynthesisError(Exception):
+    """A chunk could not be synthesized; remaining_text is the text from that chunk on."""
+
+    def __init__(self, message: str, remaining_text: str):
+        super().__init__(message)
+        self.remaining_text = remaining_text
+
+
+def mp3_duration(audio: bytes) -> float:
+    """Playback length in seconds of gTTS MP3 audio."""
+    return len(audio) * 8 / GTTS_BITRATE
+
+
+def audio_key(text: str, language_code: str) -> str:
+    return hashlib.sha256(f"{language_code}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """On-disk MP3 cache keyed by (text, language), evicting least recently used files past max_bytes."""
+
+    def __init__(self, directory: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".mp3")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)  # mtime doubles as last-used time for eviction
+            return audio
+        except OSError:
+            return None
+
+    def put(self, key: str, audio: bytes):
+        path = self._path(key)
+        try:
+            # Unique temp name so concurrent writers of the same key never clash
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write audio cache entry {key}: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".mp3"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+
+_audio_cache = None
+_executor = None
+_init_lock = threading.Lock()
+
+
+def get_audio_cache() -> AudioCache:
+    global _audio_cache
+    if _audio_cache is None:
+        with _init_lock:
+            if _audio_cache is None:
+                _audio_cache = AudioCache()
+    return _audio_cache
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=TTS_WORKERS, thread_name_prefix="tts")
+    return _executor
+
+
+def synthesize_chunk(text: str, language_code: str, max_retries: int = TTS_MAX_RETRIES) -> bytes:
+    """Synthesize one chunk with gTTS in memory, retrying just this chunk on failure."""
+    from gtts import gTTS
+
+    for attempt in range(max_retries + 1):
+        try:
+            buffer = io.BytesIO()
+            gTTS(text=text, lang=language_code, slow=False).write_to_fp(buffer)
+            audio = buffer.getvalue()
+            if audio:
+                return audio
+            raise ValueError("gTTS returned no audio")
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            delay = (2 ** attempt) * random.uniform(0.5, 1.5)
+            logger.warning(f"TTS chunk failed ({str(e)}), retrying in {delay:.1f}s "
+                           f"(attempt {attempt + 1}/{max_retries})")
+            time.sleep(delay)
+
+
+def synthesize_chunks(chunks: list[str], language_code: str):
+    """Start synthesizing every chunk concurrently; returns futures in chunk order."""
+    executor = _get_executor()
+    return [executor.submit(synthesize_chunk, chunk, language_code) for chunk in chunks]
+
+
+def iter_audio_segments(text: str, language_code: str):
+    """
+    Yield playable MP3 segments of text in order, as soon as each is synthesized.
+
+    Sentence-sized chunks are synthesized concurrently; each yielded segment
+    is the next finished chunk plus any later chunks that are already done
+    (gTTS MP3 frames can be joined directly). The full audio is cached on
+    disk by (text, language), and a cached summary is yielded in one piece.
+
+    Raises:
+        SynthesisError: when a chunk fails, after every earlier chunk was yielded
+    """
+    cache = get_audio_cache()
+    key = audio_key(text, language_code)
+    audio = cache.get(key)
+    if audio:
+        logger.info(f"Audio cache hit for {key[:12]}")
+        yield audio
+        return
+
+    chunks = split_sentences(text, first_chunk_chars=TTS_FIRST_CHUNK_CHARS)
+    if not chunks:
+        return
+    start = time.perf_counter()
+    futures = synthesize_chunks(chunks, language_code)
+    parts = []
+    try:
+        i = 0
+        while i < len(futures):
+            try:
+                segment = [futures[i].result()]
+            except Exception as e:
+                raise SynthesisError(str(e), " ".join(chunks[i:])) from e
+            i += 1
+            # A failed chunk is left for the next round so everything before it is still yielded
+            while i < len(futures) and futures[i].done() and futures[i].exception() is None:
+                segment.append(futures[i].result())
+                i += 1
+            parts.extend(segment)
+            yield b"".join(segment)
+    finally:
+        for future in futures:
+            future.cancel()
+    logger.info(f"Synthesized {len(chunks)} chunks in {time.perf_counter() - start:.1f}s")
+    cache.put(key, b"".join(parts))
+
+
+def create_audio(text: str, language_code: str):
+    """Create MP3 audio of text with gTTS and return its bytes, or None on failure."""
+    try:
+        return b"".join(iter_audio_segments(text, language_code)) or None
+    except Exception as e:
+        logger.error(f"Error generating audio: {str(e)}", exc_info=True)
+        return None
+
+
+def create_audio_offline(text: str):
+    """Create audio with pyttsx3 (offline TTS, English only) if it is installed."""
+    try:
+        import pyttsx3
+    except ImportError:
+        logger.warning("Offline TTS unavailable: pyttsx3 is not installed")
+        return None
+
+    try:
+        # pyttsx3 can only write to a file; the directory is removed once the audio is read
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = os.path.join(temp_dir, "summary_audio.wav")
+            engine = pyttsx3.init()
+            engine.setProperty('rate', 150)
+            engine.save_to_file(text, temp_path)
+            engine.runAndWait()
+            if os.path.exists(temp_path) and os.path.getsize(temp_path) > 0:
+                with open(temp_path, "rb") as f:
+                    return f.read()
+        logger.warning("Offline audio file was not created properly")
+    except Exception as e:
+        logger.error(f"Error in offline TTS: {str(e)}", exc_info=True)
+    return None
+
+
+def create_audio_with_fallback(text: str, language_code: str, on_segment=None):
+    """
+    Try online TTS first, then offline TTS for English or English online TTS for other languages.
+
+    If on_segment is given, online audio is streamed: on_segment receives each
+    playable segment as soon as it is ready, starting with the first sentences.
+    If online TTS fails partway, only the text from the failed chunk on goes
+    through the fallback, and its audio continues the segments already delivered.
+    """
+    segments = []
+    try:
+        for segment in iter_audio_segments(text, language_code):
+            if on_segment:
+                on_segment(segment)
+            segments.append(segment)
+        return b"".join(segments) or None
+    except SynthesisError as e:
+        logger.error(f"Error generating audio: {str(e)}", exc_info=True)
+        remaining = e.remaining_text
+    except Exception as e:
+        logger.error(f"Error generating audio: {str(e)}", exc_info=True)
+        segments, remaining = [], text
+
+    import streamlit as st
+
+    if language_code == "en" and not segments:
+        st.warning("Online TTS failed. Trying offline TTS instead...")
+        return create_audio_offline(remaining)
+    if language_code == "en":
+        # Offline audio (WAV) can't continue an MP3 track, so the rest is retried online
+        st.warning("Online TTS failed partway. Retrying the rest of the summary...")
+    else:
+        st.warning("Online TTS failed. Offline TTS only supports English.")
+        st.info("Attempting English TTS as fallback...")
+    rest = create_audio(remaining, "en")
+    if rest and on_segment:
+        on_segment(rest)
+    return b"".join(segments) + (rest or b"") or None
@@ -0,0 +1,213 @@
+import io
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+import threading
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import validators
+
+from summary_cache import SummaryCache, normalize_url
+from summarizer import LANGUAGES, create_llm, summarize_url
+
+logger = logging.getLogger(__name__)
+
+# Batch settings (can be overridden through environment variables or CLI flags)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "8"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "3"))
+BATCH_PER_HOST_INTERVAL = float(os.getenv("BATCH_PER_HOST_INTERVAL", "1.0"))
+
+RESULT_FIELDS = ["url", "title", "language", "word_count", "summary", "error", "elapsed"]
+
+
+def read_urls(source) -> list[str]:
+    """
+    Read URLs from a CSV or plain-text file (path or text file object).
+
+    CSV files use the "url" column if present, otherwise the first column.
+    Invalid URLs are skipped and duplicates (after normalization) are dropped.
+    """
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+    else:
+        text = source.read()
+        if isinstance(text, bytes):
+            text = text.decode("utf-8", errors="replace")
+
+    rows = list(csv.reader(io.StringIO(text)))
+    column = 0
+    if rows and any(cell.strip().lower() == "url" for cell in rows[0]):
+        column = [cell.strip().lower() for cell in rows[0]].index("url")
+        rows = rows[1:]
+
+    urls = []
+    seen = set()
+    for row in rows:
+        if len(row) <= column:
+            continue
+        url = row[column].strip()
+        if not url or not validators.url(url):
+            continue
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            urls.append(url)
+    return urls
+
+
+class HostRateLimiter:
+    """Enforce a minimum interval between requests to the same host."""
+
+    def __init__(self, interval: float = BATCH_PER_HOST_INTERVAL):
+        self.interval = interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ConcurrencyLimitedLLM:
+    """Let at most `limit` calls through to an LLM at once; a whole batch() counts as one call."""
+
+    def __init__(self, llm, limit: int):
+        self._llm = llm
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def invoke(self, *args, **kwargs):
+        with self._slots:
+            return self._llm.invoke(*args, **kwargs)
+
+    def batch(self, *args, **kwargs):
+        with self._slots:
+            return self._llm.batch(*args, **kwargs)
+
+    def stream(self, *args, **kwargs):
+        with self._slots:
+            yield from self._llm.stream(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+
+def iter_batch(urls: list[str], language: str = "English", word_count: int = 250, llm=None, cache=None,
+               workers: int = BATCH_WORKERS, llm_concurrency: int = BATCH_LLM_CONCURRENCY,
+               per_host_interval: float = BATCH_PER_HOST_INTERVAL):
+    """
+    Summarize many URLs concurrently and yield a result dict as each one finishes.
+
+    Fetches run on a pool of `workers` threads with a per-host rate limit;
+    at most `llm_concurrency` LLM requests are in flight at once. Each URL goes
+    through summarize_url, so batch summaries share the summary cache,
+    single-flight and keyword indexing with the app and the API.
+    """
+    llm = ConcurrencyLimitedLLM(llm or create_llm(), llm_concurrency)
+    cache = cache or SummaryCache()
+    limiter = HostRateLimiter(per_host_interval)
+
+    def summarize_one(url: str) -> dict:
+        start = time.perf_counter()
+        result = {"url": url, "title": "", "language": language, "word_count": word_count,
+                  "summary": "", "error": ""}
+        try:
+            limiter.wait(url)
+            # Rate limits and 5xx errors are retried per request by the LLM gateway
+            summarized = summarize_url(url, language, word_count, llm=llm, cache=cache)
+            result["title"] = summarized["title"]
+            result["summary"] = summarized["summary"]
+        except Exception as e:
+            logger.error(f"Batch item failed for {url}: {str(e)}")
+            result["error"] = str(e)
+        result["elapsed"] = round(time.perf_counter() - start, 2)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(summarize_one, url) for url in urls]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+class ResultWriter:
+    """Append batch results to a JSONL or CSV file as they arrive."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = "csv" if path.lower().endswith(".csv") else "jsonl"
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._csv = None
+        if self.format == "csv":
+            self._csv = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, result: dict):
+        if self._csv:
+            self._csv.writerow({field: result.get(field, "") for field in RESULT_FIELDS})
+        else:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def results_to_csv(results: list[dict]) -> str:
+    """Serialize batch results to CSV text."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=RESULT_FIELDS)
+    writer.writeheader()
+    for result in results:
+        writer.writerow({field: result.get(field, "") for field in RESULT_FIELDS})
+    return buffer.getvalue()
+
+
+def results_to_jsonl(results: list[dict]) -> str:
+    """Serialize batch results to JSON Lines text."""
+    return "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a list of URLs from a CSV or text file.")
+    parser.add_argument("input", help="CSV (with a 'url' column) or text file with one URL per line")
+    parser.add_argument("-o", "--output", default="summaries.jsonl", help="Output file (.jsonl or .csv)")
+    parser.add_argument("--language", default="English", choices=list(LANGUAGES.keys()))
+    parser.add_argument("--words", type=int, default=250, help="Target summary length in words")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Concurrent fetch workers")
+    parser.add_argument("--llm-concurrency", type=int, default=BATCH_LLM_CONCURRENCY,
+                        help="Maximum concurrent LLM requests")
+    parser.add_argument("--per-host-interval", type=float, default=BATCH_PER_HOST_INTERVAL,
+                        help="Minimum seconds between requests to the same host")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    urls = read_urls(args.input)
+    logger.info(f"Summarizing {len(urls)} unique URLs into {args.output}")
+
+    writer = ResultWriter(args.output)
+    failed = 0
+    try:
+        for done, result in enumerate(iter_batch(
+            urls, language=args.language, word_count=args.words, workers=args.workers,
+            llm_concurrency=args.llm_concurrency, per_host_interval=args.per_host_interval
+        ), start=1):
+            writer.write(result)
+            failed += bool(result["error"])
+            status = "FAILED" if result["error"] else "ok"
+            print(f"[{done}/{len(urls)}] {status} {result['url']} ({result['elapsed']}s)", flush=True)
+    finally:
+        writer.close()
+    print(f"Done: {len(urls) - failed} succeeded, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
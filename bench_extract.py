@@ -0,0 +1,116 @@
+"""
+Compare the lxml main-content extractor with the previous BeautifulSoup one.
+
+    python bench_extract.py bench_corpus/                  # benchmark saved pages
+    python bench_extract.py bench_corpus/ --save URL ...   # download pages into the corpus first
+
+The corpus is a directory of saved pages (`name.html`). When `name.txt` exists
+next to a page it is used as the reference main text, and extraction quality
+is reported as word-level precision/recall/F1 against it.
+"""
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+from collections import Counter
+
+from html_extract import extract_main_content
+
+
+def legacy_extract(content: bytes, encoding: str = None) -> tuple[str, str]:
+    """The BeautifulSoup extraction previously used by content_loader, kept as the baseline."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content.decode(encoding or "utf-8", errors="replace"), 'html.parser')
+    for element in soup(['script', 'style', 'nav', 'header', 'footer', 'iframe']):
+        element.decompose()
+    title = soup.title.string.strip() if soup.title and soup.title.string else ""
+    main_content = []
+    content_elements = soup.find_all(['article', 'main', 'div.content', 'div.post'])
+    if content_elements:
+        for element in content_elements:
+            main_content.append(element.get_text(strip=True, separator=' '))
+    else:
+        paragraphs = soup.find_all('p')
+        main_content = [p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 50]
+    return title, ' '.join(main_content)
+
+
+EXTRACTORS = {
+    "beautifulsoup": legacy_extract,
+    "lxml": extract_main_content,
+}
+
+
+def words(text: str) -> Counter:
+    return Counter(re.findall(r"\w+", text.lower()))
+
+
+def overlap_scores(extracted: str, reference: str) -> tuple[float, float, float]:
+    """Word-level precision, recall and F1 of extracted text against a reference."""
+    got, want = words(extracted), words(reference)
+    common = sum((got & want).values())
+    precision = common / max(1, sum(got.values()))
+    recall = common / max(1, sum(want.values()))
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def save_pages(urls: list[str], corpus: str):
+    from fetcher import fetch
+
+    os.makedirs(corpus, exist_ok=True)
+    for url in urls:
+        name = re.sub(r"[^\w.-]+", "_", url.split("://", 1)[-1]).strip("_")[:100]
+        page = fetch(url, use_cache=False)
+        with open(os.path.join(corpus, f"{name}.html"), "wb") as f:
+            f.write(page.content)
+        print(f"saved {url} -> {name}.html")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML main-content extraction.")
+    parser.add_argument("corpus", help="Directory of saved .html pages (with optional .txt references)")
+    parser.add_argument("--save", nargs="+", metavar="URL", help="Download these pages into the corpus first")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Extraction passes over the corpus")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save, args.corpus)
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.corpus, "*.html"))):
+        with open(path, "rb") as f:
+            content = f.read()
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, encoding="utf-8") as f:
+                reference = f.read()
+        pages.append((os.path.basename(path), content, reference))
+    if not pages:
+        sys.exit(f"No .html pages found in {args.corpus}")
+
+    total_bytes = sum(len(content) for _, content, _ in pages)
+    print(f"{len(pages)} pages, {total_bytes / 1e6:.2f} MB, {args.repeat} passes\n")
+    print(f"{'extractor':<15} {'pages/s':>9} {'MB/s':>7} {'words':>9} {'precision':>10} {'recall':>8} {'F1':>6}")
+    for name, extract in EXTRACTORS.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            outputs = [extract(content)[1] for _, content, _ in pages]
+        elapsed = (time.perf_counter() - start) / args.repeat
+
+        scored = [overlap_scores(text, reference) for text, (_, _, reference) in zip(outputs, pages)
+                  if reference is not None]
+        quality = ["-", "-", "-"]
+        if scored:
+            quality = [f"{sum(values) / len(values):.3f}" for values in zip(*scored)]
+        total_words = sum(sum(words(text).values()) for text in outputs)
+        print(f"{name:<15} {len(pages) / elapsed:9.1f} {total_bytes / 1e6 / elapsed:7.2f} {total_words:9d} "
+              f"{quality[0]:>10} {quality[1]:>8} {quality[2]:>6}")
+
+
+if __name__ == "__main__":
+    main()
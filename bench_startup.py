@@ -0,0 +1,83 @@
+"""
+Measure import time of the app's modules in fresh interpreters.
+
+    python bench_startup.py                  # every app module
+    python bench_startup.py summarizer -n 5  # selected modules, 5 runs each
+    python bench_startup.py --top 15         # longer list of slowest dependencies
+
+Each module is imported with `python -X importtime` in a new process so that
+nothing is already cached. The report shows the median cumulative import time
+per module and the dependencies that contributed most to it.
+"""
+import os
+import re
+import sys
+import argparse
+import statistics
+import subprocess
+
+# What the login page imports, followed by the feature modules loaded after sign-in
+LOGIN_MODULES = ["user_store", "session_tokens", "summary_history", "summary_cache", "job_queue", "pipeline"]
+FEATURE_MODULES = ["summarizer", "content_loader", "youtube_utils", "llm_gateway", "mindmap_utils",
+                   "keyword_engine", "export_utils", "api_client", "batch", "ui_components", "audio_utils"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module: str) -> dict:
+    """Return {imported name: (cumulative us, nesting depth)} for one fresh import of module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if proc.returncode != 0:
+        last_line = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+        raise RuntimeError(f"import {module} failed: {last_line}")
+    times = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            times[match.group(4)] = (int(match.group(2)), len(match.group(3)) // 2)
+    return times
+
+
+def bench_module(module: str, runs: int, top: int) -> dict:
+    samples = [import_times(module) for _ in range(runs)]
+    total = statistics.median(sample[module][0] for sample in samples) / 1000
+    # Direct dependencies of the module (depth 1 below it), skipping its own submodules
+    deps = {}
+    for sample in samples:
+        for name, (cumulative, depth) in sample.items():
+            if depth == 1 and name != module and not name.startswith(module + "."):
+                deps.setdefault(name, []).append(cumulative)
+    slowest = sorted(((statistics.median(values) / 1000, name) for name, values in deps.items()), reverse=True)
+    return {"module": module, "ms": total, "slowest": slowest[:top]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-module import time of the summarizer app.")
+    parser.add_argument("modules", nargs="*", help="Modules to measure (default: all app modules)")
+    parser.add_argument("-n", "--runs", type=int, default=3, help="Fresh imports per module")
+    parser.add_argument("--top", type=int, default=5, help="Slowest dependencies listed per module")
+    args = parser.parse_args()
+
+    groups = {"selected": args.modules} if args.modules else {
+        "login page": LOGIN_MODULES,
+        "features": FEATURE_MODULES,
+    }
+    for group, modules in groups.items():
+        print(f"== {group} ==")
+        for module in modules:
+            try:
+                result = bench_module(module, args.runs, args.top)
+            except RuntimeError as e:
+                print(f"{module:<20} {str(e)}")
+                continue
+            print(f"{module:<20} {result['ms']:8.1f} ms")
+            for ms, name in result["slowest"]:
+                print(f"    {name:<28} {ms:8.1f} ms")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import io
+import logging
+
+import regex
+from langchain.schema import Document
+
+from fetcher import fetch
+from html_extract import extract_main_content
+from youtube_utils import is_youtube_url, get_video_info, load_transcript_documents
+
+logger = logging.getLogger(__name__)
+
+# Content types the summarizer can read; anything else is refused before downloading the body
+HTML_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+PDF_TYPES = ("application/pdf",)
+
+
+def load_youtube_content(url: str) -> str:
+    """Extract YouTube content as text using yt_dlp."""
+    try:
+        info = get_video_info(url)
+        title = info.get("title") or "Video"
+        description = info.get("description") or "No description available."
+        return f"{title}\n\n{description}"
+    except Exception as e:
+        logger.error(f"YouTube extraction error: {str(e)}", exc_info=True)
+        raise Exception(f"Error extracting YouTube content: {str(e)}")
+
+
+def extract_pdf_content(content: bytes, url: str) -> tuple[str, str]:
+    """Extract the title and text of a PDF document."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(content))
+    title = (reader.metadata.title if reader.metadata else None) or url.rstrip("/").rsplit("/", 1)[-1]
+    return title, "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_website_content(url: str) -> tuple[str, str]:
+    """Extract the title and main content from a website or PDF link."""
+    try:
+        page = fetch(url, allowed_types=HTML_TYPES + PDF_TYPES)
+        if page.content_type in PDF_TYPES:
+            return extract_pdf_content(page.content, url)
+        if page.content_type == "text/plain":
+            return "", page.text
+        return extract_main_content(page.content, page.encoding)
+
+    except Exception as e:
+        logger.error(f"Website extraction error: {str(e)}", exc_info=True)
+        raise Exception(f"Error extracting website content: {str(e)}")
+
+
+def clean_text(text: str) -> str:
+    """Normalize whitespace and strip characters the summarizer doesn't need."""
+    text = regex.sub(r'\s+', ' ', text).strip()
+    # \p{M} keeps the vowel signs of Indic scripts; sentence ends of other scripts are kept too
+    return regex.sub(r'[^\w\p{M}\s.,!?।。，！？、-]', '', text)
+
+
+def get_content(url: str, language_code: str = "en") -> list[Document]:
+    """Load content from URL based on its type."""
+    try:
+        if is_youtube_url(url):
+            # Prefer the spoken transcript; fall back to title and description
+            docs = load_transcript_documents(url, language_code)
+            if docs:
+                for doc in docs:
+                    doc.page_content = clean_text(doc.page_content)
+                    doc.metadata["source"] = url
+                return docs
+            text_content = load_youtube_content(url)
+            title = get_video_info(url).get("title") or ""
+        else:
+            title, body = extract_website_content(url)
+            text_content = f"{title}\n\n{body}"
+
+        return [Document(page_content=clean_text(text_content), metadata={"source": url, "title": title})]
+
+    except Exception as e:
+        logger.error(f"Error in get_content: {str(e)}", exc_info=True)
+        raise Exception(f"Error loading content: {str(e)}")
@@ -0,0 +1,55 @@
+import re
+from datetime import datetime
+from urllib.parse import quote
+
+
+def count_words(text: str) -> int:
+    """Count words in text, handling multiple languages."""
+    text = re.sub(r'http\S+|www.\S+', '', text)
+    words = [word for word in text.split() if word.strip()]
+    return len(words)
+
+
+def create_pdf(summary: str, url: str, language: str, length: str) -> bytes:
+    """Create a PDF document containing the summary."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+
+    # Add header
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, 'Content Summary Report', ln=True, align='C')
+
+    # Add metadata
+    pdf.set_font('Arial', '', 12)
+    pdf.line(10, 30, 200, 30)
+    pdf.ln(15)
+
+    # Add summary details
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, 'Summary Details:', ln=True)
+    pdf.set_font('Arial', '', 12)
+    pdf.cell(0, 10, f'Source URL: {url}', ln=True)
+    pdf.cell(0, 10, f'Language: {language}', ln=True)
+    pdf.cell(0, 10, f'Summary Length: {length}', ln=True)
+    pdf.cell(0, 10, f'Generated on: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}', ln=True)
+
+    # Add summary content
+    pdf.ln(10)
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 10, 'Summary:', ln=True)
+    pdf.set_font('Arial', '', 12)
+
+    pdf.multi_cell(0, 10, summary)
+
+    return pdf.output(dest='S').encode('latin1')
+
+
+def get_whatsapp_share_link(title, summary, source_url):
+    """Generate WhatsApp sharing link."""
+    # Create a share text
+    whatsapp_text = f"📚 Summary of: {title}\n\n{summary}\n\nOriginal content: {source_url}"
+    whatsapp_link = f"https://wa.me/?text={quote(whatsapp_text)}"
+
+    return whatsapp_link
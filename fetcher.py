@@ -0,0 +1,333 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Fetch settings (can be overridden through environment variables)
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "http_cache")
+HTTP_CACHE_DEFAULT_TTL = int(os.getenv("HTTP_CACHE_DEFAULT_TTL", "0"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+FETCH_TIMEOUT = int(os.getenv("FETCH_TIMEOUT", "15"))
+# Largest body read into memory; bigger HTML pages are truncated, anything else is refused
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(10 * 1024 * 1024)))
+FETCH_CHUNK_SIZE = 64 * 1024
+
+# Media types whose prefix is still useful when the body is cut off at the byte cap
+TRUNCATABLE_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Response headers worth keeping alongside a cached body
+STORED_HEADERS = ("content-type", "cache-control", "etag", "last-modified", "expires", "date")
+
+
+class FetchError(Exception):
+    """A URL was fetched but its response can't be used."""
+
+
+class UnsupportedContentType(FetchError):
+    def __init__(self, url: str, content_type: str):
+        super().__init__(f"Unsupported content type {content_type!r} for {url}")
+        self.content_type = content_type
+
+
+class ContentTooLarge(FetchError):
+    def __init__(self, url: str, max_bytes: int):
+        super().__init__(f"Response from {url} is larger than {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class FetchResult:
+    """A fetched (or cached) HTTP response."""
+    url: str
+    status_code: int
+    headers: dict
+    content: bytes
+    encoding: str = None
+    from_cache: bool = False
+    revalidated: bool = False
+    elapsed: float = 0.0
+    stored_at: float = field(default_factory=time.time)
+    truncated: bool = False
+
+    @property
+    def content_type(self) -> str:
+        return media_type(self.headers)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=2)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                _session = session
+    return _session
+
+
+def parse_cache_control(value: str) -> dict:
+    """Parse a Cache-Control header into a dict of directives."""
+    directives = {}
+    for part in (value or "").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip()] = arg.strip().strip('"') or True
+    return directives
+
+
+def freshness_lifetime(headers: dict) -> float:
+    """Return how many seconds a response may be served without revalidation."""
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-cache" in directives or "no-store" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except ValueError:
+                return 0
+    if headers.get("expires"):
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+            date = parsedate_to_datetime(headers["date"]).timestamp() if headers.get("date") else time.time()
+            return max(0, expires - date)
+        except (TypeError, ValueError):
+            return 0
+    return HTTP_CACHE_DEFAULT_TTL
+
+
+def _charset(headers: dict):
+    match = re.search(r"charset=([\w-]+)", headers.get("content-type", ""), re.I)
+    return match.group(1) if match else None
+
+
+def _sniff_charset(content: bytes):
+    """Find a <meta charset> declaration near the start of an HTML body."""
+    match = META_CHARSET.search(content[:4096])
+    return match.group(1).decode("ascii") if match else None
+
+
+def media_type(headers: dict) -> str:
+    """Return the lower-cased media type of a response, without parameters."""
+    return headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+def _check_content_type(url: str, headers: dict, allowed_types):
+    content_type = media_type(headers)
+    # Servers that send no Content-Type get the benefit of the doubt
+    if allowed_types and content_type and not content_type.startswith(tuple(allowed_types)):
+        raise UnsupportedContentType(url, content_type)
+
+
+def _read_body(response, url: str, max_bytes: int) -> tuple[bytes, bool]:
+    """Read a streamed body up to max_bytes, returning (content, truncated)."""
+    truncatable = media_type(response.headers).startswith(TRUNCATABLE_TYPES)
+    declared = response.headers.get("content-length")
+    if not truncatable and declared and declared.isdigit() and int(declared) > max_bytes:
+        raise ContentTooLarge(url, max_bytes)
+
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(FETCH_CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_bytes:
+            if not truncatable:
+                raise ContentTooLarge(url, max_bytes)
+            chunks.append(chunk[:len(chunk) - (size - max_bytes)])
+            logger.warning(f"Truncated {url} at {max_bytes} bytes")
+            return b"".join(chunks), True
+        chunks.append(chunk)
+    return b"".join(chunks), False
+
+
+class HTTPCache:
+    """On-disk response cache keyed by URL, evicting least recently used entries past max_bytes."""
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".body"
+
+    def load(self, url: str):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                content = f.read()
+            os.utime(body_path)  # the body's mtime doubles as last-used time for eviction
+        except (OSError, ValueError):
+            return None
+        return FetchResult(
+            url=meta["url"],
+            status_code=meta["status_code"],
+            headers=meta["headers"],
+            content=content,
+            encoding=meta.get("encoding"),
+            from_cache=True,
+            stored_at=meta["stored_at"],
+            truncated=meta.get("truncated", False),
+        )
+
+    def store(self, result: FetchResult):
+        meta_path, body_path = self._paths(result.url)
+        meta = {
+            "url": result.url,
+            "status_code": result.status_code,
+            "headers": result.headers,
+            "encoding": result.encoding,
+            "stored_at": result.stored_at,
+            "truncated": result.truncated,
+        }
+        try:
+            # Write to temp files first so readers never see a half-written entry
+            with open(body_path + ".tmp", "wb") as f:
+                f.write(result.content)
+            with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(body_path + ".tmp", body_path)
+            os.replace(meta_path + ".tmp", meta_path)
+        except OSError as e:
+            logger.warning(f"Could not write HTTP cache entry for {result.url}: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".body"):
+                    base = entry.path[:-len(".body")]
+                    try:
+                        stat = entry.stat()
+                        size = stat.st_size + os.path.getsize(base + ".json")
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, size, base))
+            total = sum(size for _, size, _ in entries)
+            for _, size, base in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(base + ".json")
+                    os.remove(base + ".body")
+                    total -= size
+                except OSError:
+                    pass
+
+    def touch(self, result: FetchResult, headers: dict):
+        """Refresh a cached entry after a 304 Not Modified response."""
+        result.headers.update({k: v for k, v in headers.items() if k in STORED_HEADERS})
+        result.stored_at = time.time()
+        self.store(result)
+
+
+_cache = None
+
+
+def get_cache() -> HTTPCache:
+    global _cache
+    if _cache is None:
+        _cache = HTTPCache()
+    return _cache
+
+
+def fetch(url: str, timeout: int = FETCH_TIMEOUT, use_cache: bool = True,
+          max_bytes: int = FETCH_MAX_BYTES, allowed_types=None) -> FetchResult:
+    """
+    Fetch a URL through the shared session and on-disk cache.
+
+    Fresh cached responses are returned without touching the network; stale
+    ones are revalidated with If-None-Match / If-Modified-Since.
+
+    The body is streamed and never held beyond max_bytes. When allowed_types
+    (media type prefixes) is given, other content types are refused from the
+    response headers, before any of the body is downloaded.
+    """
+    start = time.time()
+    cache = get_cache() if use_cache else None
+    cached = cache.load(url) if cache else None
+
+    if cached and time.time() - cached.stored_at < freshness_lifetime(cached.headers):
+        _check_content_type(url, cached.headers, allowed_types)
+        cached.elapsed = time.time() - start
+        logger.info(f"HTTP cache hit (fresh) for {url}")
+        return cached
+
+    request_headers = {}
+    if cached:
+        if cached.headers.get("etag"):
+            request_headers["If-None-Match"] = cached.headers["etag"]
+        if cached.headers.get("last-modified"):
+            request_headers["If-Modified-Since"] = cached.headers["last-modified"]
+
+    session = get_session()
+    try:
+        response = session.get(url, headers=request_headers, timeout=timeout, verify=True, stream=True)
+    except requests.exceptions.SSLError:
+        logger.warning(f"SSL Error for {url}, retrying without verification")
+        response = session.get(url, headers=request_headers, timeout=timeout, verify=False, stream=True)
+
+    # Closing the streamed response returns its connection to the pool
+    with response:
+        headers = {k.lower(): v for k, v in response.headers.items()}
+        if response.status_code == 304 and cached:
+            _check_content_type(url, cached.headers, allowed_types)
+            cache.touch(cached, headers)
+            cached.revalidated = True
+            cached.elapsed = time.time() - start
+            logger.info(f"HTTP cache revalidated for {url}")
+            return cached
+
+        response.raise_for_status()
+        _check_content_type(url, headers, allowed_types)
+        content, truncated = _read_body(response, url, max_bytes)
+
+    result = FetchResult(
+        url=url,
+        status_code=response.status_code,
+        headers={k: v for k, v in headers.items() if k in STORED_HEADERS},
+        content=content,
+        # Declared charsets only; detecting one over the whole body costs more than parsing it
+        encoding=_charset(headers) or _sniff_charset(content),
+        elapsed=time.time() - start,
+        truncated=truncated,
+    )
+    if cache and "no-store" not in parse_cache_control(headers.get("cache-control")):
+        cache.store(result)
+    return result
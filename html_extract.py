@@ -0,0 +1,145 @@
+import re
+import logging
+
+from lxml import etree
+from lxml.html import HTMLParser, document_fromstring
+
+logger = logging.getLogger(__name__)
+
+# Elements that never hold the main content; removed before scoring
+STRIPPED_TAGS = ("script", "style", "noscript", "iframe", "nav", "header", "footer", "aside",
+                 "button", "svg", "template", "select")
+# Elements whose text counts as a paragraph of content
+TEXT_BLOCK_TAGS = ("p", "pre", "td", "blockquote")
+MIN_BLOCK_CHARS = 25
+# Candidates whose link density is checked; the rest can't win anyway
+TOP_CANDIDATES = 5
+
+POSITIVE_NAMES = re.compile(r"article|body|content|entry|hentry|main|page|post|text|blog|story", re.I)
+NEGATIVE_NAMES = re.compile(
+    r"comment|com-|contact|footer|footnote|masthead|media|meta|outbrain|promo|related|scroll|share|"
+    r"shoutbox|sidebar|skyscraper|sponsor|shopping|tags|tool|widget|nav|menu|advert|banner|cookie|"
+    r"popup|subscribe|social|breadcrumb",
+    re.I
+)
+TAG_WEIGHTS = {
+    "article": 10, "main": 10, "section": 3, "div": 5, "pre": 3, "td": 3, "blockquote": 3,
+    "ol": -3, "ul": -3, "dl": -3, "li": -3, "dd": -3, "dt": -3,
+    "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+}
+
+
+def _collapse(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _text(element) -> str:
+    # Separate text nodes so adjacent blocks ("<h1>Title</h1><p>Body") don't run together
+    return _collapse(" ".join(element.itertext()))
+
+
+def _name_weight(element) -> int:
+    """Score an element by what its class and id say it contains (e.g. div.content vs div.sidebar)."""
+    weight = 0
+    for name in (element.get("class"), element.get("id")):
+        if name:
+            if NEGATIVE_NAMES.search(name):
+                weight -= 25
+            if POSITIVE_NAMES.search(name):
+                weight += 25
+    return weight
+
+
+def _link_density(element, text_length: int) -> float:
+    if not text_length:
+        return 1.0
+    link_length = sum(len(_text(link)) for link in element.iter("a"))
+    return min(1.0, link_length / text_length)
+
+
+def parse_html(content, encoding: str = None):
+    """Parse HTML bytes or text with lxml, or return None if there is no document."""
+    parser = HTMLParser(encoding=encoding if isinstance(content, bytes) else None,
+                        remove_comments=True, remove_pis=True)
+    try:
+        return document_fromstring(content, parser=parser)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Could not parse HTML: {str(e)}")
+        return None
+
+
+def extract_title(root) -> str:
+    title = root.findtext(".//title") or ""
+    if not title.strip():
+        og_title = root.xpath("//meta[@property='og:title']/@content")
+        title = og_title[0] if og_title else ""
+    return _collapse(title)
+
+
+def extract_main_content(content, encoding: str = None) -> tuple[str, str]:
+    """
+    Extract the title and main text of an HTML page.
+
+    Readability-style: every paragraph-like block is visited once and its
+    text length and comma count are credited to its parent and grandparent.
+    Containers are also weighted by tag and by class/id names, so a
+    div.content beats a div.sidebar. The best container is penalized by its
+    link density, and siblings that also scored well are kept with it.
+    """
+    root = parse_html(content, encoding)
+    if root is None:
+        return "", ""
+    title = extract_title(root)
+    etree.strip_elements(root, *STRIPPED_TAGS, with_tail=False)
+    # Search boxes and sign-up forms go, but not forms holding paragraphs:
+    # ASP.NET WebForms and some CMS templates wrap the whole page in a single <form>
+    for form in list(root.iter("form")):
+        if not any(len(_text(block)) >= MIN_BLOCK_CHARS for block in form.iter(*TEXT_BLOCK_TAGS)):
+            form.drop_tree()
+
+    scores = {}
+    for block in root.iter(*TEXT_BLOCK_TAGS):
+        text = _text(block)
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = block.getparent()
+        grandparent = parent.getparent() if parent is not None else None
+        for node, share in ((parent, 1.0), (grandparent, 0.5)):
+            if node is None:
+                continue
+            if node not in scores:
+                scores[node] = TAG_WEIGHTS.get(node.tag, 0) + _name_weight(node)
+            scores[node] += score * share
+
+    if not scores:
+        # No paragraphs at all (e.g. a page of divs); fall back to the whole body
+        body = root.find("body")
+        return title, _text(body if body is not None else root)
+
+    best, best_score, best_text = None, None, ""
+    for node, score in sorted(scores.items(), key=lambda item: item[1], reverse=True)[:TOP_CANDIDATES]:
+        text = _text(node)
+        score *= 1 - _link_density(node, len(text))
+        if best_score is None or score > best_score:
+            best, best_score, best_text = node, score, text
+
+    parent = best.getparent()
+    if parent is None:
+        return title, best_text
+
+    # Content split across sibling containers (e.g. article body and a continuation div)
+    threshold = max(10.0, best_score * 0.2)
+    parts = []
+    for sibling in parent:
+        if sibling is best:
+            parts.append(best_text)
+        elif not isinstance(sibling.tag, str):
+            continue
+        elif scores.get(sibling, 0) >= threshold:
+            parts.append(_text(sibling))
+        elif sibling.tag == "p":
+            text = _text(sibling)
+            if len(text) > 80 and _link_density(sibling, len(text)) < 0.25:
+                parts.append(text)
+    return title, " ".join(parts)
@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+import multiprocessing
+
+from summary_cache import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Queue settings (can be overridden through environment variables)
+JOB_QUEUE_ENABLED = os.getenv("SUMMARY_JOB_QUEUE", "").lower() in ("1", "true", "yes")
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", "jobs.db")
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "0.5"))
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "600"))
+# How often a worker refreshes the job it is running; must stay well below JOB_STALE_AFTER
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(24 * 3600)))
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class SQLiteJobQueue:
+    """
+    Persistent job queue stored in SQLite.
+
+    Any object with the same enqueue/claim/heartbeat/update_partial/complete/fail/get
+    methods can replace it (see get_job_queue).
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('''CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    partial TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    updated_at REAL NOT NULL,
+                    finished_at REAL,
+                    dedupe_key TEXT)''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs (dedupe_key, status)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets pollers read while workers write
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, kind: str, payload: dict, dedupe_key: str = None) -> str:
+        """
+        Add a job and return its id.
+
+        If a queued or running job has the same dedupe_key, its id is returned
+        instead so every requester follows the one execution.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front so two processes can't both miss the existing job
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if dedupe_key:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running') LIMIT 1",
+                    (dedupe_key,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("COMMIT")
+                    logger.info(f"Joining active job {row['id']} for {dedupe_key}")
+                    return row["id"]
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, created_at, updated_at, dedupe_key) "
+                "VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), now, now, dedupe_key)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return job_id
+
+    def claim(self, worker: str):
+        """Atomically take the oldest queued job, or return None if there is none."""
+        now = time.time()
+        row = self._conn().execute(
+            "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, updated_at = ?, "
+            "attempts = attempts + 1 "
+            "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1) "
+            "AND status = 'queued' "
+            "RETURNING id, kind, payload, attempts",
+            (worker, now, now)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"]),
+                "attempts": row["attempts"]}
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """Mark a running job as alive; False if the worker no longer holds it (it was requeued)."""
+        cursor = self._conn().execute(
+            "UPDATE jobs SET updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+            (time.time(), job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def update_partial(self, job_id: str, partial: str):
+        """Store partial output so pollers can show progress."""
+        self._conn().execute(
+            "UPDATE jobs SET partial = ?, updated_at = ? WHERE id = ?", (partial, time.time(), job_id)
+        )
+
+    def complete(self, job_id: str, worker: str, result: dict) -> bool:
+        """Store the result of a job; False (and nothing stored) if worker no longer holds it."""
+        now = time.time()
+        cursor = self._conn().execute(
+            "UPDATE jobs SET status = 'done', result = ?, updated_at = ?, finished_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (json.dumps(result), now, now, job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """Mark a job as failed; False (and nothing stored) if worker no longer holds it."""
+        now = time.time()
+        cursor = self._conn().execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ?, finished_at = ? "
+            "WHERE id = ? AND worker = ? AND status = 'running'",
+            (error, now, now, job_id, worker)
+        )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str):
+        """Return a job as a dict, or None if it doesn't exist."""
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def requeue_stale(self, stale_after: int = JOB_STALE_AFTER, max_attempts: int = JOB_MAX_ATTEMPTS) -> int:
+        """Requeue running jobs whose worker stopped reporting, failing those out of attempts."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Worker stopped responding', finished_at = ? "
+            "WHERE status = 'running' AND updated_at < ? AND attempts >= ?",
+            (now, now - stale_after, max_attempts)
+        )
+        cursor = conn.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL, updated_at = ? "
+            "WHERE status = 'running' AND updated_at < ?",
+            (now, now - stale_after)
+        )
+        return cursor.rowcount
+
+    def purge_finished(self, older_than: int = JOB_RETENTION) -> int:
+        """Delete finished jobs older than the retention period."""
+        cursor = self._conn().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+            (time.time() - older_than,)
+        )
+        return cursor.rowcount
+
+
+_queue = None
+
+
+def get_job_queue():
+    """Return the process-wide job queue."""
+    global _queue
+    if _queue is None:
+        _queue = SQLiteJobQueue()
+    return _queue
+
+
+def summary_job_key(url: str, language: str, word_count: int) -> str:
+    """Key under which identical summarize jobs are deduplicated."""
+    return f"summarize:{normalize_url(url)}:{language}:{word_count}"
+
+
+def run_summarize_job(queue, job: dict, llm, cache) -> dict:
+    """Execute a "summarize" job, publishing the streamed summary as partial output."""
+    from summarizer import summarize_url
+
+    payload = job["payload"]
+    streamed = []
+    last_update = [0.0]
+
+    def publish_token(token):
+        streamed.append(token)
+        if time.monotonic() - last_update[0] > JOB_POLL_INTERVAL:
+            last_update[0] = time.monotonic()
+            queue.update_partial(job["id"], "".join(streamed))
+
+    return summarize_url(
+        payload["url"], payload["language"], payload["word_count"],
+        llm=llm, cache=cache, on_token=publish_token
+    )
+
+
+JOB_HANDLERS = {
+    "summarize": run_summarize_job,
+}
+
+
+def _send_heartbeats(queue, job_id: str, worker: str, stop_event: threading.Event,
+                     interval: float = JOB_HEARTBEAT_INTERVAL):
+    """Keep a running job from looking stale while its handler fetches, waits on rate limits or maps chunks."""
+    while not stop_event.wait(interval):
+        if not queue.heartbeat(job_id, worker):
+            logger.warning(f"Worker {worker} lost job {job_id} to another worker")
+            return
+
+
+def run_worker(queue=None, stop_event=None, poll_interval: float = JOB_POLL_INTERVAL):
+    """Claim and execute jobs until stop_event is set."""
+    from summarizer import create_llm
+    from summary_cache import SummaryCache
+
+    queue = queue or get_job_queue()
+    llm = create_llm()
+    cache = SummaryCache()
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Job worker {worker_name} started")
+
+    while not (stop_event and stop_event.is_set()):
+        job = queue.claim(worker_name)
+        if job is None:
+            queue.requeue_stale()
+            time.sleep(poll_interval)
+            continue
+
+        logger.info(f"Worker {worker_name} running {job['kind']} job {job['id']}")
+        handler = JOB_HANDLERS.get(job["kind"])
+        heartbeat_stop = threading.Event()
+        threading.Thread(target=_send_heartbeats, args=(queue, job["id"], worker_name, heartbeat_stop),
+                         daemon=True).start()
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            stored = queue.complete(job["id"], worker_name, handler(queue, job, llm, cache))
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {str(e)}", exc_info=True)
+            stored = queue.fail(job["id"], worker_name, str(e))
+        finally:
+            heartbeat_stop.set()
+        if not stored:
+            logger.warning(f"Job {job['id']} was requeued while {worker_name} ran it; its outcome was discarded")
+
+
+def _worker_process():
+    logging.basicConfig(level=logging.INFO)
+    try:
+        run_worker()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run summarization job workers.")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Number of worker processes (bounds concurrent Groq requests)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    get_job_queue().purge_finished()
+    processes = [multiprocessing.Process(target=_worker_process, daemon=True) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping workers")
+
+
+if __name__ == "__main__":
+    main()
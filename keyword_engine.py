@@ -0,0 +1,333 @@
+import os
+import re
+import sqlite3
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+
+import numpy as np
+import regex
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# Keyword index settings (can be overridden through environment variables)
+KEYWORD_INDEX_PATH = os.getenv("KEYWORD_INDEX_PATH", "keyword_index.db")
+# Longest phrase (in words) considered as a keyword
+KEYWORD_MAX_NGRAM = int(os.getenv("KEYWORD_MAX_NGRAM", "2"))
+
+# Words of at least two characters, keeping inner apostrophes and hyphens ("state-of-the-art").
+# Letters, combining marks and digits: \w misses the vowel signs of Indic scripts and splits their words
+TOKEN_PATTERN = regex.compile(r"[\p{L}\p{M}\p{N}][\p{L}\p{M}\p{N}'’-]*[\p{L}\p{M}\p{N}]")
+# Phrases never span punctuation
+PHRASE_BREAK = re.compile(r"[.,;:!?()\[\]{}\"“”|/\n•–—।、。，；：！？]+")
+
+# Used when the NLTK stopword corpus is not downloaded
+FALLBACK_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how i if in into is it its itself just may me might more most must
+my myself no nor not now of off on once only or other our ours ourselves out over own same shall she should
+so some such than that the their theirs them themselves then there these they this those through to too
+under until up us very was we were what when where which while who whom why will with would you your yours
+yourself yourselves
+""".split())
+# Words every summary uses to describe its source; never useful as keywords
+SUMMARY_STOPWORDS = frozenset("""
+article author video speaker host presenter summary overall discusses discussed explains explained covers
+covered describes described highlights highlighted mentions mentioned talks emphasizes shares provides
+also finally first second third lastly additionally however furthermore including make makes made like
+well one two many much various several way ways part
+""".split())
+
+
+@lru_cache(maxsize=None)
+def get_stopwords(language: str = "english") -> frozenset:
+    """Return the stopword set for language (always including English), loaded once per process."""
+    words = set(FALLBACK_STOPWORDS | SUMMARY_STOPWORDS)
+    try:
+        from nltk.corpus import stopwords
+
+        for name in {"english", language.lower()}:
+            if name in stopwords.fileids():
+                words.update(stopwords.words(name))
+    except (ImportError, LookupError, OSError) as e:
+        logger.warning(f"NLTK stopwords unavailable, using the built-in list: {str(e)}")
+    return frozenset(words)
+
+
+def candidate_terms(text: str, max_ngram: int = KEYWORD_MAX_NGRAM, language: str = "english") -> list[str]:
+    """
+    Return the candidate keywords of text, with repeats: every word and every
+    phrase of up to max_ngram words that has no stopword or punctuation in it.
+    """
+    stop_words = get_stopwords(language)
+    terms = []
+    for fragment in PHRASE_BREAK.split(text.lower()):
+        run = []
+        # A stopword or number ends the current run; phrases are built within runs
+        for token in TOKEN_PATTERN.findall(fragment) + [None]:
+            if token is not None and token not in stop_words and not token.isdigit():
+                run.append(token)
+                continue
+            for n in range(1, min(max_ngram, len(run)) + 1):
+                terms.extend(" ".join(run[i:i + n]) for i in range(len(run) - n + 1))
+            run = []
+    return terms
+
+
+def document_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class KeywordIndex:
+    """
+    Document frequencies of words and phrases across every summary indexed so
+    far, kept in memory as a NumPy array and persisted in SQLite.
+
+    New summaries are scored against the whole corpus, so terms that appear in
+    every summary ("video", "article") rank below the ones that make this
+    summary different. Each document is counted once, keyed by its text hash.
+    Summaries indexed by other processes (job workers, the API) are picked up
+    on the next lookup.
+    """
+
+    def __init__(self, path: str = KEYWORD_INDEX_PATH, max_ngram: int = KEYWORD_MAX_NGRAM):
+        self.path = path
+        self.max_ngram = max_ngram
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS keyword_terms (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL)''')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS keyword_documents (
+                    doc_key TEXT PRIMARY KEY)''')
+        self._conn.commit()
+
+        # term -> column of self._df; columns are only ever appended
+        self.vocabulary = {}
+        self._df = np.zeros(1024, dtype=np.int64)
+        self.n_docs = 0
+        self._load()
+
+    def _data_version(self) -> int:
+        # Changes whenever another connection commits to the database
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _load(self):
+        self._version = self._data_version()
+        rows = self._conn.execute("SELECT term, df FROM keyword_terms").fetchall()
+        self.vocabulary = {term: i for i, (term, _) in enumerate(rows)}
+        self._df = np.zeros(max(1024, 2 * len(rows)), dtype=np.int64)
+        self._df[:len(rows)] = [df for _, df in rows]
+        self.n_docs = self._conn.execute("SELECT COUNT(*) FROM keyword_documents").fetchone()[0]
+        logger.info(f"Loaded keyword index: {len(rows)} terms from {self.n_docs} documents")
+
+    def _refresh(self):
+        """Reload the document frequencies if another process indexed summaries since they were loaded."""
+        if self._data_version() != self._version:
+            self._load()
+
+    def _columns(self, terms: list[str], grow: bool = False) -> np.ndarray:
+        """Map terms to index columns; unknown terms get -1 unless grow adds them."""
+        if grow:
+            for term in terms:
+                if term not in self.vocabulary:
+                    self.vocabulary[term] = len(self.vocabulary)
+            if len(self.vocabulary) > len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(len(self.vocabulary), dtype=np.int64)])
+        return np.fromiter((self.vocabulary.get(term, -1) for term in terms), dtype=np.int64, count=len(terms))
+
+    def count_matrix(self, texts: list[str], language: str = "english"):
+        """
+        Count candidate terms of each text.
+
+        Returns a sparse (texts x terms) CSR matrix of counts and the term of each column.
+        """
+        columns = {}
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            for term in candidate_terms(text, self.max_ngram, language):
+                cols.append(columns.setdefault(term, len(columns)))
+                rows.append(row)
+        counts = sparse.csr_matrix(
+            (np.ones(len(cols), dtype=np.float64), (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64))),
+            shape=(len(texts), len(columns))
+        )
+        counts.sum_duplicates()
+        return counts, list(columns)
+
+    def document_frequency(self, terms: list[str]) -> np.ndarray:
+        """Number of indexed documents containing each term (0 for unseen terms)."""
+        with self._lock:
+            self._refresh()
+            ids = self._columns(terms)
+            return np.where(ids >= 0, self._df[np.maximum(ids, 0)], 0)
+
+    def idf(self, terms: list[str]) -> np.ndarray:
+        """Smoothed inverse document frequency of each term; unseen terms get the highest weight."""
+        df = self.document_frequency(terms)
+        return np.log((1 + self.n_docs) / (1 + df)) + 1
+
+    def tfidf(self, texts: list[str], language: str = "english"):
+        """
+        Weight the terms of each text against the corpus in one vectorized pass.
+
+        Returns an L2-normalized sparse (texts x terms) matrix with sublinear
+        term frequency, and the term of each column.
+        """
+        counts, terms = self.count_matrix(texts, language)
+        if not terms:
+            return counts, terms
+        weights = counts.copy()
+        weights.data = 1 + np.log(weights.data)
+        weights = weights.multiply(self.idf(terms)).tocsr()
+        norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return (sparse.diags(1 / norms) @ weights).tocsr(), terms
+
+    def keywords(self, text: str, top_n: int = 10, language: str = "english") -> list[str]:
+        """
+        Return the top_n keywords of text, best first.
+
+        A phrase only qualifies if it is repeated in text or already known from
+        the corpus (one-off word pairs like "video introduces" are noise), and
+        words already covered by a chosen phrase are skipped.
+        """
+        counts, terms = self.count_matrix([text], language)
+        if not terms:
+            return []
+        df = self.document_frequency(terms)
+        tf = counts.toarray().ravel()
+        lengths = np.array([term.count(" ") for term in terms])
+        # Each extra word of a phrase adds half a point, so a repeated phrase beats its own words
+        scores = (1 + np.log(tf)) * (np.log((1 + self.n_docs) / (1 + df)) + 1) * (1 + 0.5 * lengths)
+        scores[(lengths > 0) & (tf < 2) & (df == 0)] = 0
+        order = np.lexsort((-lengths, -scores))
+        keywords, covered = [], set()
+        for i in order:
+            if scores[i] <= 0:
+                break
+            words = terms[i].split()
+            if all(word in covered for word in words):
+                continue
+            keywords.append(terms[i])
+            covered.update(words)
+            if len(keywords) == top_n:
+                break
+        return keywords
+
+    def cluster_texts(self, texts: list[str], n_clusters: int, language: str = "english") -> np.ndarray:
+        """
+        Group texts by topic with average-linkage agglomerative clustering on
+        the cosine distance of their TF-IDF vectors.
+
+        Returns a cluster label (0 to n_clusters - 1) per text; texts without
+        any candidate term get -1.
+        """
+        from scipy.cluster.hierarchy import fcluster, linkage
+        from scipy.spatial.distance import squareform
+
+        weights, _ = self.tfidf(texts, language)
+        labels = np.full(len(texts), -1, dtype=np.int64)
+        rows = np.flatnonzero(weights.getnnz(axis=1))
+        if len(rows) <= max(1, n_clusters):
+            labels[rows] = np.arange(len(rows)) if n_clusters > 1 else 0
+            return labels
+        vectors = weights[rows]
+        # Rows are L2-normalized, so cosine distance is one minus the dot product
+        distances = np.clip(1 - (vectors @ vectors.T).toarray(), 0, None)
+        np.fill_diagonal(distances, 0)
+        tree = linkage(squareform(distances, checks=False), method="average")
+        labels[rows] = fcluster(tree, t=n_clusters, criterion="maxclust") - 1
+        return labels
+
+    def add_documents(self, texts: list[str], language: str = "english") -> int:
+        """Add texts to the document frequencies; texts already indexed are skipped. Returns the number added."""
+        with self._lock:
+            new_texts = []
+            for text in texts:
+                cursor = self._conn.execute("INSERT OR IGNORE INTO keyword_documents (doc_key) VALUES (?)",
+                                            (document_key(text),))
+                if cursor.rowcount:
+                    new_texts.append(text)
+            if not new_texts:
+                self._conn.commit()
+                return 0
+        counts, terms = self.count_matrix(new_texts, language)
+        # Number of new documents containing each term
+        doc_freq = np.asarray((counts > 0).sum(axis=0)).ravel().astype(np.int64)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO keyword_terms (term, df) VALUES (?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET df = df + excluded.df",
+                zip(terms, doc_freq.tolist())
+            )
+            self._conn.commit()
+            ids = self._columns(terms, grow=True)
+            np.add.at(self._df, ids, doc_freq)
+            self.n_docs += len(new_texts)
+        return len(new_texts)
+
+    def add_document(self, text: str, language: str = "english") -> bool:
+        return self.add_documents([text], language) == 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            return {"documents": self.n_docs, "terms": len(self.vocabulary)}
+
+
+_keyword_index = None
+_init_lock = threading.Lock()
+
+
+def get_keyword_index() -> KeywordIndex:
+    global _keyword_index
+    if _keyword_index is None:
+        with _init_lock:
+            if _keyword_index is None:
+                _keyword_index = KeywordIndex()
+    return _keyword_index
+
+
+def index_summary(summary: str, language: str = "English"):
+    """Add a freshly generated summary to the keyword index; failures are logged, never raised."""
+    try:
+        get_keyword_index().add_document(summary, language)
+    except Exception as e:
+        logger.warning(f"Could not add summary to the keyword index: {str(e)}")
+
+
+def rebuild_index(path: str = KEYWORD_INDEX_PATH):
+    """Index every summary in the summary cache and in users' summary history."""
+    from summary_cache import SUMMARY_CACHE_PATH
+    from user_store import USER_DB_PATH
+
+    index = KeywordIndex(path)
+    for db_path, query in ((SUMMARY_CACHE_PATH, "SELECT summary, language FROM summaries"),
+                           (USER_DB_PATH, "SELECT summary, language FROM summary_history")):
+        if not os.path.exists(db_path):
+            continue
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(query).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Skipping {db_path}: {str(e)}")
+            rows = []
+        finally:
+            conn.close()
+        by_language = {}
+        for summary, language in rows:
+            by_language.setdefault(language, []).append(summary)
+        for language, summaries in by_language.items():
+            added = index.add_documents(summaries, language)
+            print(f"{db_path}: indexed {added} new {language} summaries")
+    print(f"Keyword index: {index.stats()}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    rebuild_index()
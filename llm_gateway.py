@@ -0,0 +1,256 @@
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from langchain_groq import ChatGroq
+
+logger = logging.getLogger(__name__)
+
+# Gateway settings (can be overridden through environment variables)
+# GROQ_API_KEYS takes a comma-separated list of keys to spread load across
+GROQ_API_KEYS = [key.strip() for key in os.getenv("GROQ_API_KEYS", os.getenv("GROQ_API_KEY", "")).split(",")
+                 if key.strip()]
+# Models tried, in order, when every key is rate limited on the requested one
+LLM_FALLBACK_MODELS = [model.strip() for model in os.getenv("LLM_FALLBACK_MODELS", "").split(",") if model.strip()]
+# Budgets per (key, model); Groq enforces limits at both granularities
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "15000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+# Completion tokens reserved up front for a request until the real usage is known
+LLM_COMPLETION_TOKENS = int(os.getenv("LLM_COMPLETION_TOKENS", "1024"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of LLM tokens in text without a tokenizer."""
+    # ~4 characters per token for Latin scripts; other scripts tokenize closer to one token per word piece
+    return max(len(text) // 4, int(len(text.split()) * 1.3))
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at capacity per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (amounts above capacity only need a full bucket)."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount: float):
+        # May go negative: usage beyond the estimate is paid back before the next request
+        if self.capacity > 0:
+            self.tokens -= amount
+
+
+_http_client = None
+
+
+def get_http_client() -> httpx.Client:
+    """Return the keep-alive connection pool shared by every Groq client in the process."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS),
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=10.0),
+        )
+    return _http_client
+
+
+class _Route:
+    """One (API key, model) pair with its own budgets and cooldown."""
+
+    def __init__(self, api_key: str, model: str):
+        self.api_key = api_key
+        self.model = model
+        self.requests = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(LLM_TOKENS_PER_MINUTE)
+        self.cooldown_until = 0.0
+        self.client = ChatGroq(model=model, groq_api_key=api_key or None, max_retries=0,
+                               http_client=get_http_client())
+
+    @property
+    def name(self) -> str:
+        return f"{self.model}/...{self.api_key[-4:]}"
+
+
+# Routes (and so budgets) are shared by every gateway in the process, but not across processes
+# (see the README); one lock guards them all
+_routes = {}
+_budget_lock = threading.Lock()
+
+
+def _get_route(api_key: str, model: str) -> _Route:
+    with _budget_lock:
+        route = _routes.get((api_key, model))
+        if route is None:
+            route = _routes[(api_key, model)] = _Route(api_key, model)
+        return route
+
+
+def _status_code(error: Exception):
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Return True for rate limits, transient server errors, timeouts and dropped connections."""
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__.lower()
+    return "timeout" in name or "connection" in name or "rate limit" in str(error).lower()
+
+
+def _retry_after(error: Exception):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMGateway:
+    """
+    Rate-limited, retrying front for the Groq chat models.
+
+    Exposes the invoke/stream/batch subset of the LangChain chat model API
+    used in this app. Each request is routed to the first (key, model) pair
+    with budget left, preferring the requested model over fallbacks, and
+    retried on another route with jittered backoff when Groq rejects it.
+    """
+
+    def __init__(self, model: str, api_keys=None, fallback_models=None):
+        api_keys = api_keys or GROQ_API_KEYS or [""]
+        models = [model] + [m for m in (LLM_FALLBACK_MODELS if fallback_models is None else fallback_models)
+                            if m != model]
+        self.model = model
+        self._routes = [_get_route(key, m) for m in models for key in api_keys]
+        self._next = 0
+
+    def _acquire(self, estimated_tokens: int) -> _Route:
+        """Block until some route has budget for the request, then charge it."""
+        while True:
+            with _budget_lock:
+                now = time.monotonic()
+                best_wait, best_index = None, None
+                # Round-robin among keys so load spreads evenly, but keep the model preference order
+                order = sorted(range(len(self._routes)),
+                               key=lambda i: (self._routes[i].model != self.model,
+                                              (i - self._next) % len(self._routes)))
+                for i in order:
+                    route = self._routes[i]
+                    wait = max(route.cooldown_until - now,
+                               route.requests.wait_time(1, now),
+                               route.tokens.wait_time(estimated_tokens, now))
+                    if wait <= 0:
+                        route.requests.consume(1)
+                        route.tokens.consume(estimated_tokens)
+                        self._next = i + 1
+                        return route
+                    if best_wait is None or wait < best_wait:
+                        best_wait, best_index = wait, i
+            logger.info(f"LLM budget exhausted, waiting {best_wait:.1f}s for {self._routes[best_index].name}")
+            time.sleep(min(best_wait, LLM_BACKOFF_MAX))
+
+    def _settle(self, route: _Route, estimated_tokens: int, message):
+        """Correct the token budget with the usage Groq actually reported."""
+        usage = getattr(message, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            self._settle_tokens(route, estimated_tokens, usage["total_tokens"])
+
+    def _settle_tokens(self, route: _Route, estimated_tokens: int, used_tokens: int):
+        with _budget_lock:
+            route.tokens.consume(used_tokens - estimated_tokens)
+
+    def _penalize(self, route: _Route, error: Exception, attempt: int, estimated_tokens: int):
+        delay = _retry_after(error) or min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt))
+        delay *= random.uniform(0.5, 1.5)
+        with _budget_lock:
+            # A rejected request generated nothing, so its token reservation is returned
+            route.tokens.consume(-estimated_tokens)
+            route.cooldown_until = max(route.cooldown_until, time.monotonic() + delay)
+        logger.warning(f"LLM request on {route.name} failed ({str(error)[:100]}); "
+                       f"retrying (attempt {attempt + 1}/{LLM_MAX_RETRIES})")
+
+    def _call(self, prompt, fn):
+        estimated = estimate_tokens(str(prompt)) + LLM_COMPLETION_TOKENS
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            route = self._acquire(estimated)
+            try:
+                return route, estimated, fn(route.client)
+            except Exception as e:
+                if not is_retryable_error(e) or attempt == LLM_MAX_RETRIES:
+                    raise
+                # The route cools down; the next attempt goes to another route or waits it out
+                self._penalize(route, e, attempt, estimated)
+
+    def invoke(self, prompt, **kwargs):
+        route, estimated, message = self._call(prompt, lambda client: client.invoke(prompt, **kwargs))
+        self._settle(route, estimated, message)
+        return message
+
+    def stream(self, prompt, **kwargs):
+        """
+        Stream chunks; a failure is only retried if nothing was emitted yet.
+
+        The token budget is settled when the stream ends, with the usage Groq
+        reports on the last chunk or, failing that, an estimate of the output.
+        """
+        prompt_tokens = estimate_tokens(str(prompt))
+        estimated = prompt_tokens + LLM_COMPLETION_TOKENS
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            route = self._acquire(estimated)
+            emitted = False
+            output, usage = [], {}
+            try:
+                try:
+                    for chunk in route.client.stream(prompt, **kwargs):
+                        emitted = True
+                        output.append(chunk.content if isinstance(chunk.content, str) else "")
+                        usage = getattr(chunk, "usage_metadata", None) or usage
+                        yield chunk
+                finally:
+                    if emitted:
+                        # Also runs when the caller stops reading early or the stream fails midway
+                        self._settle_tokens(route, estimated, usage.get("total_tokens")
+                                            or prompt_tokens + estimate_tokens("".join(output)))
+                return
+            except Exception as e:
+                if emitted or not is_retryable_error(e) or attempt == LLM_MAX_RETRIES:
+                    raise
+                # The route cools down; the next attempt goes to another route or waits it out
+                self._penalize(route, e, attempt, estimated)
+
+    def batch(self, prompts, config=None, **kwargs):
+        max_concurrency = (config or {}).get("max_concurrency") or len(prompts) or 1
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            return list(pool.map(lambda prompt: self.invoke(prompt, **kwargs), prompts))
+
+    def stats(self) -> list[dict]:
+        """Remaining budget and cooldown for each route."""
+        with _budget_lock:
+            now = time.monotonic()
+            return [{
+                "route": route.name,
+                "requests_wait": round(route.requests.wait_time(1, now), 2),
+                "tokens_available": int(route.tokens.tokens),
+                "cooling_down": route.cooldown_until > now,
+            } for route in self._routes]
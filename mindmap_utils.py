@@ -1,41 +1,203 @@
-import nltk
-import graphviz
-import base64
-from io import BytesIO
-from nltk.corpus import stopwords
-from sklearn.feature_extraction.text import TfidfVectorizer
+import os
+import re
+import json
+import math
+import logging
+from functools import lru_cache
 from collections import defaultdict
-import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# Mind map settings (can be overridden through environment variables)
+# "local" builds the tree from keyword and sentence clustering in milliseconds; "llm" asks the model for it
+MINDMAP_BACKEND = os.getenv("MINDMAP_BACKEND", "local")
+MINDMAP_BACKENDS = {
+    "local": "Fast (keywords)",
+    "llm": "Detailed (AI)",
+}
+MINDMAP_MAX_BRANCHES = int(os.getenv("MINDMAP_MAX_BRANCHES", "6"))
+MINDMAP_MAX_CHILDREN = 4
+# Written without spaces between words, so the local backend can't tell the words apart:
+# mind maps of these languages always come from the LLM
+MINDMAP_LLM_ONLY_LANGUAGES = frozenset({"chinese", "japanese"})
+
+# Sentence ends and line breaks (summaries are often bulleted); CJK full stops need no space after them
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?।])\s+|(?<=[。！？])\s*|\n+")
+
+# nltk, the keyword engine (numpy/scipy) and graphviz are imported inside the functions that use them:
+# they add seconds to startup and most pages never draw a keyword mind map.
+# streamlit is only imported by the UI section, so the headless API service doesn't load it
 
 # Download NLTK resources
-@st.cache_resource
+@lru_cache(maxsize=None)
 def download_nltk_resources():
+    import nltk
+
     nltk.download('punkt')
     nltk.download('stopwords')
 
+# Mind map prompt (a plain format string; PromptTemplate would pull in langchain at import)
+MINDMAP_PROMPT = """
+    Analyze the following summary and create a visual mind map structure in JSON format.
+
+    SUMMARY:
+    {summary}
+
+    TASK:
+    Extract the most important concepts from the summary and organize them into a visual mind map structure.
+
+    The mind map should be structured with:
+    1. A central node (the main topic: "{title}")
+    2. 4-6 main branches (primary concepts/themes from the summary)
+    3. 2-4 sub-branches per main branch (supporting details, examples, or sub-concepts)
+
+    INSTRUCTIONS:
+    - Keep node text concise (3-5 words max per node)
+    - Choose visually distinct concepts for main branches
+    - Use short, impactful phrases
+    - Create a balanced structure
+
+    RESPONSE FORMAT:
+    Return ONLY a JSON object structured like this:
+    {{
+    "root": {{
+        "name": "Main Topic",
+        "children": [
+        {{
+            "name": "Branch 1",
+            "children": [
+            {{"name": "Sub-topic 1.1"}},
+            {{"name": "Sub-topic 1.2"}}
+            ]
+        }},
+        {{
+            "name": "Branch 2",
+            "children": [
+            {{"name": "Sub-topic 2.1"}},
+            {{"name": "Sub-topic 2.2"}}
+            ]
+        }}
+        ]
+    }}
+    }}
+
+    Return ONLY the valid JSON object, nothing else.
+    """
+
+def _node_name(term: str) -> str:
+    return term[:1].upper() + term[1:]
+
+def _is_mindmap(data) -> bool:
+    root = data.get("root") if isinstance(data, dict) else None
+    return isinstance(root, dict) and bool(root.get("name")) and isinstance(root.get("children"), list) \
+        and bool(root["children"]) and all(isinstance(child, dict) and child.get("name") for child in root["children"])
+
+# Function to generate the mind map tree with an LLM
+def generate_llm_mindmap_data(llm, summary, title="Content Summary"):
+    """
+    Generate a visual mind map structure from a summary using an LLM.
+
+    Args:
+        llm: Language model to use
+        summary: Text summary to convert into a mind map
+        title: Central node title
+
+    Returns:
+        JSON data for the mind map
+
+    Raises:
+        ValueError: if the model did not return a usable mind map
+    """
+    # Run through the LLM gateway so the call shares the rate limits and retries
+    result = llm.invoke(MINDMAP_PROMPT.format(summary=summary, title=title)).content
+
+    # Clean the result to ensure it's valid JSON
+    result = result.strip()
+    # Remove any markdown code blocks if present
+    result = re.sub(r'```json\s*|\s*```', '', result)
+    result = re.sub(r'```\s*|\s*```', '', result)
+
+    mindmap_data = json.loads(result)
+    if not _is_mindmap(mindmap_data):
+        raise ValueError("response is not a root/children mind map")
+    return mindmap_data
+
+# Function to generate the mind map tree locally
+def generate_local_mindmap_data(summary, title="Content Summary", language="english"):
+    """
+    Build the same root/children mind map structure without an LLM.
+
+    Sentences of the summary are grouped by topic (TF-IDF vectors and
+    agglomerative clustering), and each group becomes a branch named after
+    its top keyword, with its next keywords as sub-branches.
+
+    Raises:
+        ValueError: if the summary has too little text for a mind map, or
+            its language is in MINDMAP_LLM_ONLY_LANGUAGES
+    """
+    from keyword_engine import get_keyword_index
+
+    if language.lower() in MINDMAP_LLM_ONLY_LANGUAGES:
+        raise ValueError(f"Fast mind maps are not available for {language}")
+    index = get_keyword_index()
+    sentences = [sentence.strip(" -*•\t") for sentence in SENTENCE_SPLIT.split(summary)]
+    sentences = [sentence for sentence in sentences if len(sentence.split()) >= 3]
+    n_branches = min(MINDMAP_MAX_BRANCHES, max(1, round(math.sqrt(2 * len(sentences)))))
+    labels = index.cluster_texts(sentences, n_branches, language)
+
+    # Branches follow the order in which their topics first appear in the summary
+    groups = {}
+    for label, sentence in zip(labels, sentences):
+        if label >= 0:
+            groups.setdefault(label, []).append(sentence)
+
+    # Nodes never repeat each other or the central topic
+    used = {title.lower()}
+    branches = []
+    if len(groups) < 2:
+        # A single topic: its keywords become the branches
+        for keyword in index.keywords(summary, MINDMAP_MAX_BRANCHES + 1, language):
+            if keyword not in used and len(branches) < MINDMAP_MAX_BRANCHES:
+                branches.append({"name": _node_name(keyword)})
+    else:
+        for group in groups.values():
+            keywords = [keyword for keyword in index.keywords(" ".join(group), MINDMAP_MAX_CHILDREN + 4, language)
+                        if keyword not in used][:MINDMAP_MAX_CHILDREN + 1]
+            if not keywords:
+                continue
+            used.update(keywords)
+            branch = {"name": _node_name(keywords[0])}
+            if len(keywords) > 1:
+                branch["children"] = [{"name": _node_name(keyword)} for keyword in keywords[1:]]
+            branches.append(branch)
+    if not branches:
+        raise ValueError("The summary has too little text to build a mind map")
+    return {"root": {"name": title, "children": branches}}
+
+def generate_mindmap_data(llm, summary, title="Content Summary", backend=None, language="english"):
+    """
+    Generate the mind map tree of a summary with the selected backend (MINDMAP_BACKENDS).
+
+    The LLM backend falls back to the local one if the model's answer is not a usable mind map.
+    Languages the local backend can't handle (MINDMAP_LLM_ONLY_LANGUAGES) always use the LLM.
+    """
+    backend = backend or MINDMAP_BACKEND
+    local_supported = language.lower() not in MINDMAP_LLM_ONLY_LANGUAGES
+    if (backend == "llm" or not local_supported) and llm is not None:
+        try:
+            return generate_llm_mindmap_data(llm, summary, title)
+        except ValueError as e:
+            if not local_supported:
+                raise
+            logger.warning(f"LLM mind map unusable ({str(e)}), building it locally instead")
+    return generate_local_mindmap_data(summary, title, language)
+
 # Function to extract keywords
-def extract_keywords(text, num_keywords=10):
-    """Extract the most important keywords from text using TF-IDF."""
-    stop_words = set(stopwords.words('english'))
-    
-    # Clean text
-    text = ' '.join([word for word in text.lower().split() 
-                    if word.isalnum() and word not in stop_words])
-    
-    # Use TF-IDF to extract important keywords
-    vectorizer = TfidfVectorizer(max_features=num_keywords, stop_words='english')
-    try:
-        tfidf_matrix = vectorizer.fit_transform([text])
-        keywords = vectorizer.get_feature_names_out()
-        return keywords
-    except:
-        # Fallback if TF-IDF fails (e.g., with very short text)
-        words = text.split()
-        word_counts = defaultdict(int)
-        for word in words:
-            word_counts[word] += 1
-        sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, count in sorted_words[:num_keywords]]
+def extract_keywords(text, num_keywords=10, language="english"):
+    """Extract the most distinctive keywords and phrases of text against every summary indexed so far."""
+    from keyword_engine import get_keyword_index
+
+    return get_keyword_index().keywords(text, num_keywords, language)
 
 # Function to build the mindmap structure
 def build_mindmap_structure(keywords):
@@ -64,58 +226,108 @@ def build_mindmap_structure(keywords):
     
     return hierarchy, root
 
-# Function to generate mindmap from text and return base64 encoded image
-def generate_mindmap(text, theme="dark"):
-    """Generate a mindmap visualization from text."""
-    keywords = extract_keywords(text)
-    hierarchy, root = build_mindmap_structure(keywords)
-    
-    # Configure graph based on theme
-    if theme == "dark":
-        bgcolor = "#121212"
-        fontcolor = "white"
-        root_color = "#6A5ACD"  # Slate blue
-        main_topic_color = "#DAA520"  # Goldenrod
-        subtopic_color = "#2E8B57"  # Sea green
-        edge_color = "#FFFFFF"
-    else:
-        bgcolor = "#FFFFFF"
-        fontcolor = "black"
-        root_color = "#4B0082"  # Indigo
-        main_topic_color = "#FF8C00"  # Dark orange
-        subtopic_color = "#228B22"  # Forest green
-        edge_color = "#000000"
-    
-    # Create the graph
-    graph = graphviz.Digraph(format='png')
-    graph.attr(bgcolor=bgcolor, fontcolor=fontcolor, rankdir="TB", 
+# Graph colors per theme
+MINDMAP_THEMES = {
+    "dark": {
+        "bgcolor": "#121212",
+        "fontcolor": "white",
+        "root_color": "#6A5ACD",  # Slate blue
+        "main_topic_color": "#DAA520",  # Goldenrod
+        "subtopic_color": "#2E8B57",  # Sea green
+        "edge_color": "#FFFFFF",
+    },
+    "light": {
+        "bgcolor": "#FFFFFF",
+        "fontcolor": "black",
+        "root_color": "#4B0082",  # Indigo
+        "main_topic_color": "#FF8C00",  # Dark orange
+        "subtopic_color": "#228B22",  # Forest green
+        "edge_color": "#000000",
+    },
+}
+
+# Image formats the keyword mind map can be rendered to, with their MIME types
+MINDMAP_FORMATS = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+}
+
+# Rendering settings (can be overridden through environment variables)
+# "subprocess" runs the dot binary through the graphviz package; "inprocess" lays out with libgraphviz
+# through pygraphviz (if installed), avoiding a fork per render
+MINDMAP_RENDERER = os.getenv("MINDMAP_RENDERER", "subprocess")
+MINDMAP_RENDER_CACHE_SIZE = int(os.getenv("MINDMAP_RENDER_CACHE_SIZE", "128"))
+
+# Function to build the Graphviz source of a mindmap
+def mindmap_dot_source(hierarchy, root, theme="dark"):
+    """Return the DOT source of the mindmap hierarchy drawn in theme."""
+    import graphviz
+
+    colors = MINDMAP_THEMES.get(theme, MINDMAP_THEMES["dark"])
+    graph = graphviz.Digraph()
+    graph.attr(bgcolor=colors["bgcolor"], fontcolor=colors["fontcolor"], rankdir="TB",
                splines="curved", concentrate="true")
-    
+
     # Add nodes and edges
     for parent, children in hierarchy.items():
         if parent == root:
-            graph.node(parent, parent, shape='box', style='filled,rounded', 
-                      fillcolor=root_color, fontcolor='white', fontsize="16")
+            graph.node(parent, parent, shape='box', style='filled,rounded',
+                       fillcolor=colors["root_color"], fontcolor='white', fontsize="16")
         else:
-            graph.node(parent, parent, shape='box', style='filled,rounded', 
-                      fillcolor=main_topic_color, fontcolor='white')
-            
+            graph.node(parent, parent, shape='box', style='filled,rounded',
+                       fillcolor=colors["main_topic_color"], fontcolor='white')
+
         for child in children:
-            graph.node(child, child, shape='box', style='filled,rounded', 
-                      fillcolor=subtopic_color, fontcolor='white')
-            graph.edge(parent, child, color=edge_color, penwidth="1.5")
-    
-    # Render the graph to a PNG image
-    png_data = graph.pipe(format='png')
-    
-    # Encode to base64 for display in HTML
-    encoded = base64.b64encode(png_data).decode('utf-8')
-    
-    return encoded
+            graph.node(child, child, shape='box', style='filled,rounded',
+                       fillcolor=colors["subtopic_color"], fontcolor='white')
+            graph.edge(parent, child, color=colors["edge_color"], penwidth="1.5")
+    return graph.source
+
+def _render_inprocess(source, fmt):
+    try:
+        import pygraphviz
+    except ImportError:
+        logger.warning("In-process rendering unavailable: pygraphviz is not installed, running dot instead")
+        return None
+    # pygraphviz lays out and renders through libgvc in this process
+    return pygraphviz.AGraph(string=source).draw(format=fmt, prog="dot")
+
+@lru_cache(maxsize=MINDMAP_RENDER_CACHE_SIZE)
+def _render_cached(hierarchy_items, root, theme, fmt, renderer):
+    source = mindmap_dot_source(dict(hierarchy_items), root, theme)
+    if renderer == "inprocess":
+        image = _render_inprocess(source, fmt)
+        if image is not None:
+            return image
+    import graphviz
+
+    return graphviz.Source(source).pipe(format=fmt)
+
+# Function to render a mindmap hierarchy to image bytes
+def render_mindmap(hierarchy, root, theme="dark", fmt="svg", renderer=None):
+    """
+    Render a mindmap hierarchy to raw image bytes in fmt (see MINDMAP_FORMATS).
+
+    Renders are cached per (hierarchy, theme, format), so redrawing the same
+    mindmap (e.g. on every Streamlit rerun) never runs Graphviz again.
+    """
+    if fmt not in MINDMAP_FORMATS:
+        raise ValueError(f"Unsupported mindmap format: {fmt}")
+    hierarchy_items = tuple((parent, tuple(children)) for parent, children in hierarchy.items())
+    return _render_cached(hierarchy_items, root, theme, fmt, renderer or MINDMAP_RENDERER)
+
+# Function to generate mindmap from text and return the rendered image
+def generate_mindmap(text, theme="dark", fmt="svg"):
+    """Generate a mindmap visualization from text and return the image bytes."""
+    keywords = extract_keywords(text)
+    hierarchy, root = build_mindmap_structure(keywords)
+    return render_mindmap(hierarchy, root, theme, fmt)
 
 # UI section for the mindmap
-def add_mindmap_section(summary_text, dark_mode=True, timestamp=None):
+def add_mindmap_section(summary_text, dark_mode=True, timestamp=None, fmt="svg"):
     """Add the mindmap UI section to the Streamlit app."""
+    import streamlit as st
+
     if summary_text:
         st.markdown("---")
         st.subheader("Key Concepts Mindmap")
@@ -126,21 +338,21 @@ def add_mindmap_section(summary_text, dark_mode=True, timestamp=None):
         
         with st.spinner("Generating mindmap..."):
             try:
-                encoded_image = generate_mindmap(summary_text, theme)
-                st.markdown(f'<img src="data:image/png;base64,{encoded_image}" width="100%">', 
-                           unsafe_allow_html=True)
-                
-                # Add download button for the mindmap image
-                buffered = BytesIO(base64.b64decode(encoded_image))
+                image = generate_mindmap(summary_text, theme, fmt)
+                # The same bytes are shown and downloaded; nothing is re-encoded
+                if fmt == "svg":
+                    st.html(image.decode("utf-8"))
+                else:
+                    st.image(image)
                 
                 # Generate a timestamp-based filename if timestamp is provided
-                file_name = f"mindmap_{timestamp}.png" if timestamp else "mindmap.png"
+                file_name = f"mindmap_{timestamp}.{fmt}" if timestamp else f"mindmap.{fmt}"
                 
                 st.download_button(
                     label="Download Mindmap",
-                    data=buffered.getvalue(),
+                    data=image,
                     file_name=file_name,
-                    mime="image/png",
+                    mime=MINDMAP_FORMATS[fmt],
                     key="mindmap_download"
                 )
             except Exception as e:
@@ -0,0 +1,46 @@
+import time
+import logging
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageResult:
+    """Outcome of one pipeline stage."""
+    name: str
+    result: object = None
+    error: Exception = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_timed(name: str, fn) -> StageResult:
+    start = time.perf_counter()
+    try:
+        result = fn()
+        return StageResult(name, result=result, elapsed=time.perf_counter() - start)
+    except Exception as e:
+        logger.error(f"Stage {name} failed: {str(e)}", exc_info=True)
+        return StageResult(name, error=e, elapsed=time.perf_counter() - start)
+
+
+def run_stages(stages: dict, max_workers: int = None, initializer=None):
+    """
+    Run independent stages concurrently and yield a StageResult as each one finishes.
+
+    Args:
+        stages: Mapping of stage name to a zero-argument callable
+        max_workers: Worker pool size (defaults to one worker per stage)
+        initializer: Optional callable run in each worker thread before any stage
+    """
+    if not stages:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages), initializer=initializer) as pool:
+        futures = [pool.submit(_run_timed, name, fn) for name, fn in stages.items()]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,135 @@
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import logging
+import secrets
+import tempfile
+
+from user_store import connection
+
+logger = logging.getLogger(__name__)
+
+# Token settings (can be overridden through environment variables)
+SESSION_TOKEN_TTL = int(os.getenv("SESSION_TOKEN_TTL", str(7 * 24 * 3600)))
+SESSION_SECRET_PATH = os.getenv("SESSION_SECRET_PATH", ".session_secret")
+
+CREATE_REVOKED_TABLE = '''CREATE TABLE IF NOT EXISTS revoked_tokens (
+                nonce TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL)'''
+INSERT_REVOKED = "INSERT OR IGNORE INTO revoked_tokens (nonce, expires_at) VALUES (?, ?)"
+SELECT_REVOKED = "SELECT 1 FROM revoked_tokens WHERE nonce = ?"
+PURGE_REVOKED = "DELETE FROM revoked_tokens WHERE expires_at < ?"
+
+# Name of the browser cookie that carries the session token
+SESSION_COOKIE = "summarizer_session"
+
+_secret = None
+
+
+def _read_secret() -> bytes:
+    with open(SESSION_SECRET_PATH, "rb") as f:
+        return f.read().strip()
+
+
+def _create_secret() -> bytes:
+    """Persist a new random secret, or return the one another process created first."""
+    secret = secrets.token_hex(32).encode()
+    # Written in full under a temporary name and linked into place, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(SESSION_SECRET_PATH)),
+                                    prefix=".session_secret.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(secret)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.link(tmp_path, SESSION_SECRET_PATH)
+        except FileExistsError:
+            secret = _read_secret()
+    finally:
+        os.remove(tmp_path)
+    return secret
+
+
+def _get_secret() -> bytes:
+    """Load the signing secret from SESSION_SECRET, or a persisted file shared by all processes."""
+    global _secret
+    if _secret is None:
+        if os.getenv("SESSION_SECRET"):
+            secret = os.getenv("SESSION_SECRET").encode()
+        else:
+            try:
+                secret = _read_secret()
+            except FileNotFoundError:
+                secret = _create_secret()
+        if not secret:
+            raise RuntimeError(f"Session secret is empty; delete {SESSION_SECRET_PATH} or set SESSION_SECRET")
+        _secret = secret
+    return _secret
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64(hmac.new(_get_secret(), payload.encode(), hashlib.sha256).digest())
+
+
+def init_token_store():
+    with connection() as conn:
+        conn.execute(CREATE_REVOKED_TABLE)
+        conn.execute(PURGE_REVOKED, (time.time(),))
+
+
+def issue_token(username: str, ttl: int = SESSION_TOKEN_TTL) -> str:
+    """Create a signed session token for an authenticated user."""
+    payload = _b64(json.dumps({
+        "u": username,
+        "exp": int(time.time()) + ttl,
+        "n": secrets.token_hex(8),
+    }).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def _decode(token: str):
+    try:
+        payload, signature = token.split(".", 1)
+    except (AttributeError, ValueError):
+        return None
+    if not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        claims = json.loads(_unb64(payload))
+    except ValueError:
+        return None
+    if claims.get("exp", 0) < time.time():
+        return None
+    return claims
+
+
+def verify_token(token: str):
+    """Return the username a valid, unrevoked token was issued to, or None."""
+    claims = _decode(token)
+    if claims is None:
+        return None
+    with connection() as conn:
+        if conn.execute(SELECT_REVOKED, (claims["n"],)).fetchone():
+            return None
+    return claims["u"]
+
+
+def revoke_token(token: str):
+    """Invalidate a token, e.g. on logout."""
+    claims = _decode(token)
+    if claims is None:
+        return
+    with connection() as conn:
+        conn.execute(INSERT_REVOKED, (claims["n"], claims["exp"]))
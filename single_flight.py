@@ -0,0 +1,102 @@
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+_DONE = object()
+
+
+class _Call:
+    def __init__(self):
+        self.future = Future()
+        self.events = []
+        self.subscribers = []
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the function on a worker thread; callers
+    that arrive while it is running share that execution instead of starting
+    their own. Events the function publishes (e.g. streamed tokens) are
+    replayed to late joiners and then delivered as they happen. Every
+    caller's on_event runs on that caller's own thread, and an exception it
+    raises (e.g. a Streamlit rerun) only stops that caller from waiting: the
+    shared execution and the other callers carry on.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"executions": 0, "shared": 0}
+
+    def do(self, key, fn, on_event=None):
+        """
+        Run fn(publish) once for all concurrent callers with the same key.
+
+        Returns:
+            Tuple of (result, shared) where shared is True for callers that
+            reused another caller's execution
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            shared = call is not None
+            if shared:
+                self._stats["shared"] += 1
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executions"] += 1
+            if on_event:
+                # Snapshot and subscribe atomically so no event is missed or repeated
+                replay = list(call.events)
+                events = queue.Queue()
+                call.subscribers.append(events)
+
+        if shared:
+            logger.info(f"Joining in-flight call for {key!r}")
+        else:
+            threading.Thread(target=self._run, args=(key, call, fn), name="single-flight", daemon=True).start()
+
+        if on_event:
+            try:
+                for event in replay:
+                    on_event(event)
+                while (event := events.get()) is not _DONE:
+                    on_event(event)
+            finally:
+                with self._lock:
+                    call.subscribers.remove(events)
+        return call.future.result(), shared
+
+    def _run(self, key, call: _Call, fn):
+        def publish(event):
+            with self._lock:
+                call.events.append(event)
+                for subscriber in call.subscribers:
+                    subscriber.put(event)
+
+        try:
+            call.future.set_result(fn(publish))
+        except Exception as e:
+            call.future.set_exception(e)
+        except BaseException:
+            # Never hand an interpreter-level exit to the callers' threads
+            logger.error(f"In-flight call for {key!r} was interrupted", exc_info=True)
+            call.future.set_exception(RuntimeError(f"In-flight call for {key!r} was interrupted"))
+        finally:
+            self._finish(key, call)
+
+    def _finish(self, key, call: _Call):
+        with self._lock:
+            self._calls.pop(key, None)
+            for subscriber in call.subscribers:
+                subscriber.put(_DONE)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "in_flight": len(self._calls)}
@@ -0,0 +1,267 @@
+import os
+import time
+import hashlib
+import logging
+
+from langchain.prompts import PromptTemplate
+from langchain.schema import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from content_loader import get_content
+from youtube_utils import is_youtube_url
+from summary_cache import make_cache_key, normalize_url
+from single_flight import SingleFlight
+from llm_gateway import LLMGateway, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Model used for summaries and chat
+MODEL_NAME = "mixtral-8x7b-32768"
+
+# Supported languages dictionary with their codes
+LANGUAGES = {
+    "English": "en",
+    "Hindi": "hi",
+    "Spanish": "es",
+    "French": "fr",
+    "German": "de",
+    "Chinese": "zh",
+    "Japanese": "ja",
+    "Korean": "ko",
+    "Russian": "ru",
+    "Arabic": "ar",
+    "Bengali": "bn",
+    "Tamil": "ta",
+    "Telugu": "te"
+}
+
+# Summary length options
+SUMMARY_LENGTHS = {
+    "Short (150 words)": 150,
+    "Medium (250 words)": 250,
+    "Long (300 words)": 300
+}
+
+# Summarization settings (can be overridden through environment variables)
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+SUMMARY_STUFF_MAX_TOKENS = int(os.getenv("SUMMARY_STUFF_MAX_TOKENS", "6000"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "2500"))
+SUMMARY_CHUNK_OVERLAP_TOKENS = int(os.getenv("SUMMARY_CHUNK_OVERLAP_TOKENS", "150"))
+# Collapse rounds allowed before the partial summaries are truncated to fit the reduce prompt
+SUMMARY_MAX_COLLAPSE_ROUNDS = int(os.getenv("SUMMARY_MAX_COLLAPSE_ROUNDS", "3"))
+
+# Summary prompt template
+SUMMARY_PROMPT = """
+Create a comprehensive summary of the following content directly in {language}.
+The summary should be exactly {word_count} words long.
+
+Content: {text}
+
+Requirements:
+1. Generate the summary DIRECTLY in {language}
+2. Make it exactly {word_count} words
+3. Maintain natural and fluent language
+4. Use appropriate script for the language (e.g., Devanagari for Hindi)
+5. Focus on key points and main ideas
+"""
+
+summary_prompt = PromptTemplate(template=SUMMARY_PROMPT, input_variables=["text", "language", "word_count"])
+
+# Map step prompt - partial summaries stay in the source language so they can
+# be reused for any target language and length
+MAP_PROMPT = """
+Write a concise summary of the following part of a longer piece of content.
+Keep every key point, name, number and conclusion. Do not add an introduction.
+
+Content: {text}
+
+Concise summary:
+"""
+
+map_prompt = PromptTemplate(template=MAP_PROMPT, input_variables=["text"])
+
+
+def create_llm(model: str = MODEL_NAME) -> LLMGateway:
+    """Create the rate-limited Groq chat model used for summaries, mind maps and chat."""
+    return LLMGateway(model)
+
+
+_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=SUMMARY_CHUNK_TOKENS,
+    chunk_overlap=SUMMARY_CHUNK_OVERLAP_TOKENS,
+    length_function=estimate_tokens,
+)
+
+
+def split_documents(docs: list[Document]) -> list[Document]:
+    """Split documents that are larger than one map chunk, keeping their metadata."""
+    chunks = []
+    for doc in docs:
+        if estimate_tokens(doc.page_content) <= SUMMARY_CHUNK_TOKENS:
+            chunks.append(doc)
+        else:
+            chunks.extend(_splitter.split_documents([doc]))
+    return chunks
+
+
+def chunk_key(text: str, model: str) -> str:
+    """Cache key of a chunk's map-step summary."""
+    return hashlib.sha256(f"{model}\x1f{MAP_PROMPT}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+def map_summaries(llm, texts: list[str], model: str = "", cache=None,
+                  max_concurrency: int = SUMMARY_MAP_CONCURRENCY) -> list[str]:
+    """
+    Summarize each text independently, running up to max_concurrency LLM calls at once.
+
+    When a cache is given, chunks summarized before are not sent to the LLM again.
+    """
+    keys = [chunk_key(text, model) for text in texts]
+    cached = cache.get_partials(keys) if cache else {}
+    missing = [(key, text) for key, text in zip(keys, texts) if key not in cached]
+    logger.info(f"Map step: {len(texts) - len(missing)} cached, {len(missing)} to summarize")
+
+    if missing:
+        prompts = [map_prompt.format(text=text) for _, text in missing]
+        results = llm.batch(prompts, config={"max_concurrency": max_concurrency})
+        fresh = {key: result.content for (key, _), result in zip(missing, results)}
+        if cache:
+            cache.put_partials(fresh)
+        cached.update(fresh)
+
+    return [cached[key] for key in keys]
+
+
+def _group_texts(texts: list[str], max_tokens: int) -> list[str]:
+    groups = []
+    current = []
+    size = 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and size + tokens > max_tokens:
+            groups.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(text)
+        size += tokens
+    if current:
+        groups.append("\n\n".join(current))
+    return groups
+
+
+def _truncate_texts(texts: list[str], max_tokens: int) -> list[str]:
+    """Shorten every text by the same proportion so that together they fit in max_tokens."""
+    total = sum(estimate_tokens(text) for text in texts)
+    if total <= max_tokens:
+        return texts
+    keep = max_tokens / total
+    return [text[:int(len(text) * keep)] for text in texts]
+
+
+def stream_text(llm, prompt_text: str, on_token) -> str:
+    """Stream a completion, passing each token to on_token, and return the full text."""
+    parts = []
+    for chunk in llm.stream(prompt_text):
+        if chunk.content:
+            parts.append(chunk.content)
+            on_token(chunk.content)
+    return "".join(parts)
+
+
+def summarize_documents(llm, docs, prompt, language: str, word_count: int,
+                        model: str = "", cache=None, on_token=None) -> str:
+    """
+    Summarize documents with the final summary prompt.
+
+    Inputs that fit in a single prompt are "stuffed" into it. Longer inputs go
+    through map-reduce: token-sized chunks are summarized concurrently (reusing
+    cached chunk summaries), partial summaries are collapsed until they fit, and
+    the reduce step writes the final summary in the requested language and length.
+
+    If on_token is given, the final step is streamed and each token is passed to it.
+    """
+    texts = [doc.page_content for doc in docs if doc.page_content.strip()]
+    total_tokens = sum(estimate_tokens(text) for text in texts)
+
+    if total_tokens > SUMMARY_STUFF_MAX_TOKENS:
+        chunks = [doc.page_content for doc in split_documents(docs) if doc.page_content.strip()]
+        logger.info(f"Map-reduce summarization over {len(chunks)} chunks (~{total_tokens} tokens)")
+        partials = map_summaries(llm, chunks, model=model, cache=cache)
+        rounds = 0
+        while sum(estimate_tokens(text) for text in partials) > SUMMARY_STUFF_MAX_TOKENS and len(partials) > 1:
+            if rounds == SUMMARY_MAX_COLLAPSE_ROUNDS:
+                # The model isn't shrinking the partials enough; stop paying for more rounds
+                logger.warning(f"Partial summaries still too long after {rounds} collapse rounds; truncating them")
+                break
+            partials = map_summaries(llm, _group_texts(partials, SUMMARY_CHUNK_TOKENS), model=model, cache=cache)
+            rounds += 1
+        texts = _truncate_texts(partials, SUMMARY_STUFF_MAX_TOKENS)
+    else:
+        logger.info(f"Stuff summarization (~{total_tokens} tokens)")
+
+    final_prompt = prompt.format(text="\n\n".join(texts), language=language, word_count=word_count)
+    if on_token:
+        return stream_text(llm, final_prompt, on_token)
+    return llm.invoke(final_prompt).content
+
+
+# Concurrent requests for the same summary share one fetch and one LLM call
+summary_flights = SingleFlight()
+
+
+def summarize_url(url: str, language: str = "English", word_count: int = 250, llm=None,
+                  cache=None, on_token=None) -> dict:
+    """
+    Fetch a URL and summarize it, reusing a cached summary of the same content if available.
+
+    Identical requests already running in this process are joined rather than
+    repeated; their streamed tokens are replayed to on_token.
+
+    Returns:
+        Dict with url, title, language, word_count, summary, cached, shared and elapsed
+    """
+    start = time.perf_counter()
+    result, shared = summary_flights.do(
+        (normalize_url(url), language, word_count),
+        lambda publish: _summarize_url(url, language, word_count, llm, cache, publish),
+        on_event=on_token
+    )
+    return {**result, "shared": shared, "elapsed": round(time.perf_counter() - start, 2)}
+
+
+def _summarize_url(url: str, language: str, word_count: int, llm, cache, on_token) -> dict:
+    start = time.perf_counter()
+    docs = get_content(url, LANGUAGES.get(language, "en"))
+    default_title = "YouTube Content" if is_youtube_url(url) else "Web Content"
+    title = docs[0].metadata.get("title") or default_title
+
+    cache_key = make_cache_key(url, "\n".join(doc.page_content for doc in docs), language, word_count, MODEL_NAME)
+    summary = cache.get(cache_key) if cache else None
+    cached = summary is not None
+    if cached:
+        logger.info(f"Summary cache hit for {url}")
+    else:
+        # Long content (e.g. hour-long transcripts) goes through map-reduce
+        summary = summarize_documents(
+            llm or create_llm(), docs, summary_prompt, language, word_count,
+            model=MODEL_NAME, cache=cache, on_token=on_token
+        )
+        if cache:
+            cache.put(cache_key, summary, url=url, language=language, word_count=word_count, model=MODEL_NAME)
+        # Keywords of later summaries are weighted against everything summarized before;
+        # indexing is best effort and must never fail a summary that was already generated
+        try:
+            from keyword_engine import index_summary
+
+            index_summary(summary, language)
+        except Exception as e:
+            logger.warning(f"Could not add summary to the keyword index: {str(e)}")
+
+    return {
+        "url": url,
+        "title": title,
+        "language": language,
+        "word_count": word_count,
+        "summary": summary,
+        "cached": cached,
+        "elapsed": round(time.perf_counter() - start, 2),
+    }
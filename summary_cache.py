@@ -0,0 +1,187 @@
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+import time
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+logger = logging.getLogger(__name__)
+
+# Cache settings (can be overridden through environment variables)
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "summary_cache.db")
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "2000"))
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", str(7 * 24 * 3600)))
+
+# Query parameters that never change the content of a page
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "si", "feature"}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL so that trivially different links share a cache entry."""
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower() or "https"
+    netloc = parsed.netloc.lower()
+    if netloc.endswith(":80") and scheme == "http":
+        netloc = netloc[:-3]
+    elif netloc.endswith(":443") and scheme == "https":
+        netloc = netloc[:-4]
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+
+    query = [
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ]
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse((scheme, netloc, path, "", urlencode(sorted(query)), ""))
+
+
+def text_hash(text: str) -> str:
+    """Return a stable hash of extracted content."""
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def make_cache_key(url: str, text: str, language: str, word_count: int, model: str) -> str:
+    """Build the content-addressed key for a summary."""
+    parts = [normalize_url(url), text_hash(text), language, str(word_count), model]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """SQLite-backed summary cache with TTL and LRU eviction."""
+
+    def __init__(self, path: str = SUMMARY_CACHE_PATH, max_entries: int = SUMMARY_CACHE_MAX_ENTRIES,
+                 ttl: int = SUMMARY_CACHE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS summaries (
+                    cache_key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    word_count INTEGER NOT NULL,
+                    model TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0)''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_accessed ON summaries (last_accessed)")
+        # Map-step summaries of individual chunks, shared across languages and lengths
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS partial_summaries (
+                    chunk_key TEXT PRIMARY KEY,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_accessed REAL NOT NULL)''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_partial_summaries_last_accessed ON partial_summaries (last_accessed)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Return the cached summary for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, created_at FROM summaries WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM summaries WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE summaries SET last_accessed = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, summary: str, url: str, language: str, word_count: int, model: str):
+        """Store a summary and evict old entries if the cache is over its limits."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries "
+                "(cache_key, url, language, word_count, model, summary, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_url(url), language, word_count, model, summary, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def get_partials(self, keys: list[str]) -> dict:
+        """Return cached chunk summaries for the given chunk keys."""
+        if not keys:
+            return {}
+        now = time.time()
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT chunk_key, summary, created_at FROM partial_summaries WHERE chunk_key IN ({placeholders})",
+                keys
+            ).fetchall()
+            found = {key: summary for key, summary, created_at in rows
+                     if not self.ttl or now - created_at <= self.ttl}
+            if found:
+                self._conn.execute(
+                    f"UPDATE partial_summaries SET last_accessed = ? "
+                    f"WHERE chunk_key IN ({','.join('?' * len(found))})",
+                    [now, *found]
+                )
+                self._conn.commit()
+        return found
+
+    def put_partials(self, partials: dict):
+        """Store chunk summaries keyed by chunk key."""
+        if not partials:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO partial_summaries (chunk_key, summary, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?)",
+                [(key, summary, now, now) for key, summary in partials.items()]
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        for table, key_column in (("summaries", "cache_key"), ("partial_summaries", "chunk_key")):
+            if self.ttl:
+                self._conn.execute(f"DELETE FROM {table} WHERE created_at < ?", (now - self.ttl,))
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE {key_column} IN "
+                    f"(SELECT {key_column} FROM {table} ORDER BY last_accessed ASC LIMIT ?)",
+                    (overflow,)
+                )
+                logger.info(f"Evicted {overflow} least recently used rows from {table}")
+
+    def clear(self):
+        """Remove every cached summary."""
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries")
+            self._conn.execute("DELETE FROM partial_summaries")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters for this process and the current entry count."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
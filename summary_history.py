@@ -0,0 +1,145 @@
+import re
+import json
+import time
+import sqlite3
+import logging
+
+from user_store import connection, get_user_id
+
+logger = logging.getLogger(__name__)
+
+CREATE_HISTORY_TABLE = '''CREATE TABLE IF NOT EXISTS summary_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                url TEXT NOT NULL,
+                title TEXT,
+                language TEXT NOT NULL,
+                length TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                mindmap TEXT,
+                timings TEXT,
+                created_at REAL NOT NULL)'''
+CREATE_HISTORY_INDEX = "CREATE INDEX IF NOT EXISTS idx_history_user_created ON summary_history (user_id, created_at)"
+
+# External-content FTS5 index kept in sync with the history table by triggers
+CREATE_HISTORY_FTS = '''CREATE VIRTUAL TABLE IF NOT EXISTS summary_history_fts USING fts5(
+                title, url, summary, content='summary_history', content_rowid='id')'''
+CREATE_HISTORY_TRIGGERS = [
+    '''CREATE TRIGGER IF NOT EXISTS summary_history_ai AFTER INSERT ON summary_history BEGIN
+           INSERT INTO summary_history_fts (rowid, title, url, summary)
+           VALUES (new.id, new.title, new.url, new.summary);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS summary_history_ad AFTER DELETE ON summary_history BEGIN
+           INSERT INTO summary_history_fts (summary_history_fts, rowid, title, url, summary)
+           VALUES ('delete', old.id, old.title, old.url, old.summary);
+       END''',
+]
+
+INSERT_HISTORY = '''INSERT INTO summary_history
+                (user_id, url, title, language, length, summary, mindmap, timings, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+UPDATE_HISTORY_MINDMAP = "UPDATE summary_history SET mindmap = ? WHERE id = ?"
+UPDATE_HISTORY_TIMINGS = "UPDATE summary_history SET timings = ? WHERE id = ?"
+SELECT_HISTORY_ENTRY = "SELECT * FROM summary_history WHERE id = ? AND user_id = ?"
+SELECT_RECENT_HISTORY = '''SELECT id, url, title, language, length, created_at FROM summary_history
+                WHERE user_id = ? ORDER BY created_at DESC LIMIT ?'''
+SEARCH_HISTORY = '''SELECT h.id, h.url, h.title, h.language, h.length, h.created_at
+                FROM summary_history_fts JOIN summary_history h ON h.id = summary_history_fts.rowid
+                WHERE summary_history_fts MATCH ? AND h.user_id = ?
+                ORDER BY bm25(summary_history_fts) LIMIT ?'''
+SEARCH_HISTORY_LIKE = '''SELECT id, url, title, language, length, created_at FROM summary_history
+                WHERE user_id = ? AND (title LIKE ? OR url LIKE ? OR summary LIKE ?)
+                ORDER BY created_at DESC LIMIT ?'''
+DELETE_HISTORY_ENTRY = "DELETE FROM summary_history WHERE id = ? AND user_id = ?"
+
+_fts_available = True
+
+
+def init_history():
+    """Create the history table and its full-text index."""
+    global _fts_available
+    with connection() as conn:
+        conn.execute(CREATE_HISTORY_TABLE)
+        conn.execute(CREATE_HISTORY_INDEX)
+        try:
+            conn.execute(CREATE_HISTORY_FTS)
+            for trigger in CREATE_HISTORY_TRIGGERS:
+                conn.execute(trigger)
+        except sqlite3.OperationalError as e:
+            # SQLite builds without FTS5 still get (slower) substring search
+            logger.warning(f"FTS5 unavailable, history search falls back to LIKE: {str(e)}")
+            _fts_available = False
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word as a prefix."""
+    words = re.findall(r"\w+", text, flags=re.UNICODE)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def save_summary(username, result: dict, language: str, length: str, mindmap=None, timings=None):
+    """Store a finished summary in the user's history and return its id."""
+    user_id = get_user_id(username)
+    if user_id is None:
+        return None
+    with connection() as conn:
+        cursor = conn.execute(INSERT_HISTORY, (
+            user_id,
+            result["url"],
+            result.get("title") or "",
+            language,
+            length,
+            result["summary"],
+            json.dumps(mindmap) if mindmap else None,
+            json.dumps(timings) if timings else None,
+            time.time(),
+        ))
+    return cursor.lastrowid
+
+
+def update_mindmap(entry_id, mindmap):
+    with connection() as conn:
+        conn.execute(UPDATE_HISTORY_MINDMAP, (json.dumps(mindmap), entry_id))
+
+
+def update_timings(entry_id, timings: dict):
+    with connection() as conn:
+        conn.execute(UPDATE_HISTORY_TIMINGS, (json.dumps(timings), entry_id))
+
+
+def get_entry(username, entry_id):
+    """Return a full history entry belonging to the user, or None."""
+    user_id = get_user_id(username)
+    with connection() as conn:
+        cursor = conn.execute(SELECT_HISTORY_ENTRY, (entry_id, user_id))
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    entry = dict(zip((column[0] for column in cursor.description), row))
+    entry["mindmap"] = json.loads(entry["mindmap"]) if entry["mindmap"] else None
+    entry["timings"] = json.loads(entry["timings"]) if entry["timings"] else {}
+    return entry
+
+
+def search_history(username, query: str = "", limit: int = 20) -> list:
+    """Return the user's most relevant (or, without a query, most recent) history entries."""
+    user_id = get_user_id(username)
+    if user_id is None:
+        return []
+    fts_query = _fts_query(query)
+    with connection() as conn:
+        if not fts_query:
+            rows = conn.execute(SELECT_RECENT_HISTORY, (user_id, limit)).fetchall()
+        elif _fts_available:
+            rows = conn.execute(SEARCH_HISTORY, (fts_query, user_id, limit)).fetchall()
+        else:
+            pattern = f"%{query.strip()}%"
+            rows = conn.execute(SEARCH_HISTORY_LIKE, (user_id, pattern, pattern, pattern, limit)).fetchall()
+    columns = ("id", "url", "title", "language", "length", "created_at")
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def delete_entry(username, entry_id):
+    user_id = get_user_id(username)
+    with connection() as conn:
+        conn.execute(DELETE_HISTORY_ENTRY, (entry_id, user_id))
@@ -0,0 +1,317 @@
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from youtube_utils import extract_youtube_video_id, get_video_info
+from export_utils import get_whatsapp_share_link
+
+logger = logging.getLogger(__name__)
+
+
+def get_youtube_video_details(url: str) -> dict:
+    """Get title, thumbnail, and channel details for a YouTube video."""
+    try:
+        video_id = extract_youtube_video_id(url)
+        
+        if not video_id:
+            return {
+                "title": "Unknown Title",
+                "thumbnail": None,
+                "channel": "Unknown Channel",
+                "success": False
+            }
+        
+        # Shared, memoized yt_dlp metadata
+        info = get_video_info(url)
+        
+        return {
+            "title": info.get("title") or "Unknown Title",
+            "thumbnail": info.get("thumbnail"),
+            "channel": info.get("uploader") or "Unknown Channel",
+            "channel_url": info.get("uploader_url"),
+            "duration": info.get("duration") or 0,
+            "view_count": info.get("view_count") or 0,
+            "upload_date": info.get("upload_date") or "Unknown",
+            "success": True
+        }
+    
+    except Exception as e:
+        logger.error(f"Error getting YouTube details: {str(e)}", exc_info=True)
+        return {
+            "title": "Error retrieving video details",
+            "thumbnail": None,
+            "channel": "Unknown",
+            "success": False
+        }
+
+
+def display_youtube_video_info(url: str):
+    """Display YouTube video information in the Streamlit UI."""
+    st.subheader("Video Information")
+
+    with st.spinner("Retrieving video details..."):
+        video_details = get_youtube_video_details(url)
+    
+        if video_details["success"]:
+            # Create columns for layout
+            col1, col2 = st.columns([1, 2])
+        
+            with col1:
+                # Display thumbnail
+                if video_details["thumbnail"]:
+                    st.image(video_details["thumbnail"], use_container_width=True)
+                else:
+                    st.info("Thumbnail not available")
+        
+            with col2:
+                # Display video details
+                st.markdown(f"**Title:** {video_details['title']}")
+                st.markdown(f"**Channel:** {video_details['channel']}")
+            
+                # Display additional details if available
+                if video_details.get("view_count"):
+                    st.markdown(f"**Views:** {video_details['view_count']:,}")
+            
+                if video_details.get("duration"):
+                    minutes = video_details['duration'] // 60
+                    seconds = video_details['duration'] % 60
+                    st.markdown(f"**Duration:** {minutes} min {seconds} sec")
+            
+                if video_details.get("upload_date"):
+                    date = video_details["upload_date"]
+                    try:
+                        # Format date if it's in YYYYMMDD format
+                        formatted_date = f"{date[0:4]}-{date[4:6]}-{date[6:8]}"
+                        st.markdown(f"**Upload Date:** {formatted_date}")
+                    except:
+                        st.markdown(f"**Upload Date:** {date}")
+            
+                # Add link to channel
+                if video_details.get("channel_url"):
+                    st.markdown(f"[Visit Channel]({video_details['channel_url']})")
+        
+            # Add a divider
+            st.markdown("---")
+
+
+def render_visual_mindmap(mindmap_data, height=500):
+    """
+    Render a visual mind map in Streamlit using D3.js.
+    
+    Args:
+        mindmap_data: JSON data for the mind map
+        height: Height of the rendered component
+    """
+    # Generate a unique ID for this mindmap
+    mindmap_id = "mindmap_" + hashlib.md5(str(datetime.now()).encode()).hexdigest()[:8]
+    
+    # Convert the mindmap data to a JSON string
+    mindmap_json = json.dumps(mindmap_data)
+    
+    # D3.js and custom styling for the mindmap
+    html = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <script src="https://d3js.org/d3.v7.min.js"></script>
+        <style>
+            #{mindmap_id} {{
+                width: 100%;
+                height: {height}px;
+                overflow: hidden;
+                margin: 0 auto;
+                font-family: Arial, sans-serif;
+            }}
+            .node circle {{
+                fill: #fff;
+                stroke: #4682B4;
+                stroke-width: 3px;
+                cursor: pointer;
+            }}
+            .node text {{
+                font: 14px sans-serif;
+            }}
+            .link {{
+                fill: none;
+                stroke: #ccc;
+                stroke-width: 2px;
+            }}
+            .root-node circle {{
+                fill: #4682B4;
+                stroke: #2E5984;
+                stroke-width: 3px;
+            }}
+            .root-node text {{
+                font-weight: bold;
+                font-size: 16px;
+            }}
+            .main-branch circle {{
+                fill: #fff;
+                stroke: #5F9EA0;
+                stroke-width: 2.5px;
+            }}
+            .sub-branch circle {{
+                fill: #fff;
+                stroke: #87CEEB;
+                stroke-width: 2px;
+            }}
+            .tooltip {{
+                position: absolute;
+                text-align: center;
+                padding: 8px;
+                font: 12px sans-serif;
+                background: #f9f9f9;
+                border: 1px solid #ccc;
+                border-radius: 5px;
+                pointer-events: none;
+                opacity: 0;
+                transition: opacity 0.3s;
+            }}
+        </style>
+    </head>
+    <body>
+        <div id="{mindmap_id}"></div>
+        <script>
+        (function() {{
+            // Parse the data
+            const data = {mindmap_json};
+            
+            // Set up the SVG container
+            const width = document.getElementById('{mindmap_id}').clientWidth;
+            const height = {height};
+            const margin = {{top: 20, right: 90, bottom: 20, left: 90}};
+            
+            // Create a tooltip div
+            const tooltip = d3.select("#{mindmap_id}")
+                .append("div")
+                .attr("class", "tooltip");
+            
+            const svg = d3.select("#{mindmap_id}")
+                .append("svg")
+                .attr("width", width)
+                .attr("height", height)
+                .append("g")
+                .attr("transform", `translate(${{margin.left}},${{margin.top}})`);
+            
+            // Create a tree layout
+            const treeWidth = width - margin.left - margin.right;
+            const treeHeight = height - margin.top - margin.bottom;
+            const treeLayout = d3.tree().size([treeHeight, treeWidth]);
+            
+            // Create a hierarchy from the data
+            const root = d3.hierarchy(data.root);
+            
+            // Assign position to nodes
+            treeLayout(root);
+            
+            // Create links
+            svg.selectAll(".link")
+                .data(root.links())
+                .join("path")
+                .attr("class", "link")
+                .attr("d", d3.linkHorizontal()
+                    .x(d => d.y)
+                    .y(d => d.x)
+                );
+            
+            // Create nodes
+            const node = svg.selectAll(".node")
+                .data(root.descendants())
+                .join("g")
+                .attr("class", d => {{
+                    if (d.depth === 0) return "node root-node";
+                    if (d.depth === 1) return "node main-branch";
+                    return "node sub-branch";
+                }})
+                .attr("transform", d => `translate(${{d.y}},${{d.x}})`)
+                .on("mouseover", function(event, d) {{
+                    tooltip.transition()
+                        .duration(200)
+                        .style("opacity", .9);
+                    tooltip.html(d.data.name)
+                        .style("left", (event.pageX) + "px")
+                        .style("top", (event.pageY - 28) + "px");
+                }})
+                .on("mouseout", function(d) {{
+                    tooltip.transition()
+                        .duration(500)
+                        .style("opacity", 0);
+                }});
+            
+            // Add circles to nodes
+            node.append("circle")
+                .attr("r", d => d.depth === 0 ? 25 : (d.depth === 1 ? 15 : 10));
+            
+            // Add text labels
+            node.append("text")
+                .attr("dy", ".35em")
+                .attr("x", d => d.children ? -13 : 13)
+                .style("text-anchor", d => d.children ? "end" : "start")
+                .text(d => d.data.name);
+            
+            // Add zoom capability
+            const zoom = d3.zoom()
+                .scaleExtent([0.5, 2])
+                .on("zoom", (event) => {{
+                    svg.attr("transform", event.transform);
+                }});
+            
+            d3.select("#{mindmap_id} svg")
+                .call(zoom);
+        }})();
+        </script>
+    </body>
+    </html>
+    """
+    
+    # Render the HTML
+    components.html(html, height=height+50)
+
+
+def setup_whatsapp_sharing_ui(title, summary, url):
+    """Set up the WhatsApp sharing UI section"""
+    st.subheader("Share Summary:")
+    
+    # Generate WhatsApp sharing link
+    whatsapp_link = get_whatsapp_share_link(
+        title=title,
+        summary=summary,
+        source_url=url
+    )
+    
+    
+    st.markdown("### Share to WhatsApp")
+    st.markdown("This will share the complete summary with the original link.")
+    whatsapp_preview = f"""
+    📱 WhatsApp Preview:
+    
+    📚 Summary of: {title}
+    
+    {summary[:150]}...
+    
+    Original content: {url}
+    
+    """
+    st.markdown(whatsapp_preview)
+    st.markdown(f"[![Share on WhatsApp](https://img.shields.io/badge/Share_on-WhatsApp-25D366?style=for-the-badge&logo=whatsapp&logoColor=white)]({whatsapp_link})")
+    st.markdown("---")
+        
+    # Add copy functionality for complete summary
+    st.subheader("Copy Full Summary")
+    full_share_text = f"""📚 Summary of: {title}
+
+{summary}
+
+Original content: {url}
+
+Generated by Multi-Source Content Summarizer"""
+    
+    st.code(full_share_text, language="markdown")
+    st.button("📋 Copy to Clipboard", 
+            on_click=lambda: st.write("Summary copied to clipboard!"),
+            help="Copy the full summary to paste manually into any platform")
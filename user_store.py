@@ -0,0 +1,211 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+import multiprocessing
+from queue import Empty, LifoQueue
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+USER_DB_PATH = os.getenv("USER_DB_PATH", "users.db")
+# Connections shared by every script run and worker thread of the process
+USER_DB_POOL_SIZE = int(os.getenv("USER_DB_POOL_SIZE", "4"))
+
+# Password hashing settings (can be overridden through environment variables)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# SQL is kept in constants so sqlite3's per-connection statement cache reuses the prepared statements
+CREATE_USERS_TABLE = '''CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password TEXT NOT NULL)'''
+INSERT_USER = "INSERT INTO users (username, password) VALUES (?, ?)"
+SELECT_PASSWORD = "SELECT password FROM users WHERE username = ?"
+SELECT_USER_ID = "SELECT id FROM users WHERE username = ?"
+UPDATE_PASSWORD = "UPDATE users SET password = ? WHERE username = ?"
+
+_connections = LifoQueue()
+_connections_opened = 0
+_connections_lock = threading.Lock()
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "login_attempts": 0,
+    "login_successes": 0,
+    "login_failures": 0,
+    "login_seconds": 0.0,
+    "registrations": 0,
+    "registration_conflicts": 0,
+    "registration_seconds": 0.0,
+    "connections_opened": 0,
+    "rehashes": 0,
+}
+
+
+def _record(**updates):
+    with _metrics_lock:
+        for key, value in updates.items():
+            _metrics[key] += value
+
+
+def _open_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(USER_DB_PATH, timeout=10, cached_statements=64, check_same_thread=False)
+    # WAL lets logins read while a registration writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA cache_size=-8000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    _record(connections_opened=1)
+    return conn
+
+
+@contextmanager
+def connection():
+    """
+    Borrow a connection to the user database from the process-wide pool.
+
+    Streamlit runs every rerun on a new thread, so connections belong to the
+    pool rather than to a thread; at most USER_DB_POOL_SIZE are ever opened.
+    The with-block is one transaction: committed on success, rolled back on error.
+    """
+    global _connections_opened
+    try:
+        conn = _connections.get_nowait()
+    except Empty:
+        with _connections_lock:
+            can_open = _connections_opened < USER_DB_POOL_SIZE
+            if can_open:
+                _connections_opened += 1
+        conn = _open_connection() if can_open else _connections.get()
+    try:
+        with conn:
+            yield conn
+    finally:
+        _connections.put(conn)
+
+
+# Database setup
+def init_db():
+    with connection() as conn:
+        conn.execute(CREATE_USERS_TABLE)
+
+
+# bcrypt runs in a bounded process pool so hashing never blocks script threads or the GIL.
+# Workers are spawned, not forked: a fork of Streamlit's multi-threaded server can copy a held lock and hang
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=BCRYPT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _bcrypt_hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _bcrypt_check(password: bytes, hashed_password: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed_password)
+
+
+def _run_in_pool(fn, *args):
+    global _pool
+    try:
+        return _get_pool().submit(fn, *args).result()
+    except BrokenProcessPool:
+        logger.warning("bcrypt process pool broke; recreating it and retrying inline")
+        with _pool_lock:
+            _pool = None
+        return fn(*args)
+
+
+def hash_rounds(hashed_password: str) -> int:
+    """Return the work factor a bcrypt hash was created with."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+# Function to hash passwords
+def hash_password(password):
+    return _run_in_pool(_bcrypt_hash, password.encode(), BCRYPT_ROUNDS).decode()
+
+
+# Function to check password
+def verify_password(password, hashed_password):
+    return _run_in_pool(_bcrypt_check, password.encode(), hashed_password.encode())
+
+
+# Function to register a user
+def register_user(username, password):
+    start = time.perf_counter()
+    hashed = hash_password(password)
+    try:
+        with connection() as conn:
+            conn.execute(INSERT_USER, (username, hashed))
+        _record(registrations=1, registration_seconds=time.perf_counter() - start)
+        return True
+    except sqlite3.IntegrityError:
+        _record(registration_conflicts=1, registration_seconds=time.perf_counter() - start)
+        return False
+
+
+# Function to authenticate a user
+def authenticate_user(username, password):
+    start = time.perf_counter()
+    with connection() as conn:
+        user = conn.execute(SELECT_PASSWORD, (username,)).fetchone()
+    if not user:
+        _record(login_attempts=1, login_failures=1, login_seconds=time.perf_counter() - start)
+        return False
+
+    ok = verify_password(password, user[0])
+    if ok and hash_rounds(user[0]) != BCRYPT_ROUNDS:
+        # Upgrade the hash to the configured work factor while we have the password
+        new_hash = hash_password(password)
+        with connection() as conn:
+            conn.execute(UPDATE_PASSWORD, (new_hash, username))
+        _record(rehashes=1)
+    _record(
+        login_attempts=1,
+        login_successes=int(ok),
+        login_failures=int(not ok),
+        login_seconds=time.perf_counter() - start,
+    )
+    return ok
+
+
+def get_user_id(username):
+    """Return the id of a user, or None if they don't exist."""
+    with connection() as conn:
+        row = conn.execute(SELECT_USER_ID, (username,)).fetchone()
+    return row[0] if row else None
+
+
+def get_metrics() -> dict:
+    """Return login/registration counters and average latencies for this process."""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics["avg_login_seconds"] = (
+        metrics["login_seconds"] / metrics["login_attempts"] if metrics["login_attempts"] else 0.0
+    )
+    total_registrations = metrics["registrations"] + metrics["registration_conflicts"]
+    metrics["avg_registration_seconds"] = (
+        metrics["registration_seconds"] / total_registrations if total_registrations else 0.0
+    )
+    return metrics
@@ -0,0 +1,185 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlparse, parse_qs
+
+from langchain.schema import Document
+
+logger = logging.getLogger(__name__)
+
+# Metadata cache settings (can be overridden through environment variables)
+YOUTUBE_INFO_TTL = int(os.getenv("YOUTUBE_INFO_TTL", "3600"))
+YOUTUBE_INFO_MAX_ENTRIES = int(os.getenv("YOUTUBE_INFO_MAX_ENTRIES", "500"))
+TRANSCRIPT_CHUNK_CHARS = int(os.getenv("TRANSCRIPT_CHUNK_CHARS", "6000"))
+
+# Fields of the yt-dlp info dict that the app actually uses
+INFO_FIELDS = ("id", "title", "description", "thumbnail", "uploader", "uploader_url",
+               "duration", "view_count", "upload_date")
+
+YDL_OPTS = {
+    'quiet': True,
+    'skip_download': True,
+    'no_warnings': True,
+    'youtube_include_dash_manifest': False
+}
+
+_info_cache = {}
+_in_flight = {}
+_lock = threading.Lock()
+
+
+def is_youtube_url(url: str) -> bool:
+    """Check if the URL is a YouTube video URL."""
+    youtube_domains = ['youtube.com', 'youtu.be']
+    parsed_url = urlparse(url)
+    return any(domain in parsed_url.netloc for domain in youtube_domains)
+
+
+def extract_youtube_video_id(url: str) -> str:
+    """Extract the video ID from a YouTube URL."""
+    parsed_url = urlparse(url)
+
+    if parsed_url.netloc == 'youtu.be':
+        return parsed_url.path[1:]
+
+    if parsed_url.netloc in ('www.youtube.com', 'youtube.com', 'm.youtube.com'):
+        if parsed_url.path == '/watch':
+            return parse_qs(parsed_url.query).get('v', [None])[0]
+        elif parsed_url.path.startswith(('/embed/', '/v/', '/shorts/')):
+            return parsed_url.path.split('/')[2]
+
+    # Could not extract ID
+    return None
+
+
+def _extract_info(url: str) -> dict:
+    # yt_dlp takes a noticeable time to import; load it on first use
+    from yt_dlp import YoutubeDL
+
+    with YoutubeDL(YDL_OPTS) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return {key: info.get(key) for key in INFO_FIELDS}
+
+
+def _prune(now: float):
+    for video_id in [vid for vid, (expires, _) in _info_cache.items() if expires <= now]:
+        del _info_cache[video_id]
+    while len(_info_cache) > YOUTUBE_INFO_MAX_ENTRIES:
+        _info_cache.pop(next(iter(_info_cache)))
+
+
+def get_video_info(url: str) -> dict:
+    """
+    Return yt-dlp metadata for a video, extracting it at most once per TTL.
+
+    Concurrent callers asking for the same video wait on the extraction
+    already in progress instead of starting their own.
+    """
+    video_id = extract_youtube_video_id(url) or url
+    now = time.time()
+    with _lock:
+        entry = _info_cache.get(video_id)
+        if entry and entry[0] > now:
+            return entry[1]
+        future = _in_flight.get(video_id)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _in_flight[video_id] = future
+
+    if not is_leader:
+        logger.info(f"Waiting for in-flight YouTube extraction of {video_id}")
+        return future.result()
+
+    try:
+        info = _extract_info(url)
+    except BaseException as e:
+        with _lock:
+            _in_flight.pop(video_id, None)
+        future.set_exception(e)
+        raise
+
+    with _lock:
+        _info_cache[video_id] = (time.time() + YOUTUBE_INFO_TTL, info)
+        _in_flight.pop(video_id, None)
+        _prune(time.time())
+    future.set_result(info)
+    return info
+
+
+def fetch_transcript(video_id: str, language_code: str = "en") -> list[dict]:
+    """
+    Fetch the transcript of a video as a list of {text, start, duration} segments.
+
+    Preference order: manual captions in the requested language, auto-generated
+    captions in that language, a YouTube translation into that language, and
+    finally whatever transcript the video has.
+    """
+    from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound
+
+    transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+
+    try:
+        transcript = transcript_list.find_manually_created_transcript([language_code])
+    except NoTranscriptFound:
+        try:
+            transcript = transcript_list.find_generated_transcript([language_code])
+        except NoTranscriptFound:
+            available = list(transcript_list)
+            if not available:
+                raise
+            transcript = available[0]
+            translatable = {lang["language_code"] for lang in transcript.translation_languages}
+            if transcript.is_translatable and language_code in translatable:
+                transcript = transcript.translate(language_code)
+
+    logger.info(f"Using {transcript.language_code} transcript for {video_id} "
+                f"(generated={transcript.is_generated})")
+    return transcript.fetch()
+
+
+def iter_transcript_documents(segments, title: str = "", max_chars: int = TRANSCRIPT_CHUNK_CHARS):
+    """Group timed transcript segments into Documents of at most max_chars characters."""
+    buffer = []
+    size = 0
+    start = None
+    end = 0.0
+    for segment in segments:
+        text = segment["text"].replace("\n", " ").strip()
+        if not text:
+            continue
+        if buffer and size + len(text) > max_chars:
+            yield Document(page_content=" ".join(buffer),
+                           metadata={"title": title, "start": start, "end": end})
+            buffer, size, start = [], 0, None
+        if start is None:
+            start = segment["start"]
+        end = segment["start"] + segment.get("duration", 0)
+        buffer.append(text)
+        size += len(text) + 1
+    if buffer:
+        yield Document(page_content=" ".join(buffer),
+                       metadata={"title": title, "start": start, "end": end})
+
+
+def load_transcript_documents(url: str, language_code: str = "en") -> list[Document]:
+    """Load a video's transcript as timed Documents, or an empty list if it can't be retrieved."""
+    import requests
+    from youtube_transcript_api import CouldNotRetrieveTranscript, NoTranscriptFound, TranscriptsDisabled
+
+    video_id = extract_youtube_video_id(url)
+    if not video_id:
+        return []
+    try:
+        segments = fetch_transcript(video_id, language_code)
+    except (NoTranscriptFound, TranscriptsDisabled) as e:
+        logger.info(f"No transcript available for {video_id}: {e}")
+        return []
+    except (CouldNotRetrieveTranscript, requests.RequestException) as e:
+        # Unavailable videos, rate limits, blocked IPs, network errors: fall back to the title and description
+        logger.warning(f"Could not retrieve transcript for {video_id}: {str(e)[:200]}")
+        return []
+    title = get_video_info(url).get("title") or ""
+    return list(iter_transcript_documents(segments, title=title))